@@ -2,28 +2,37 @@
 """
 Simple HTTP server for serving the TOBI frontend
 """
-import http.server
-import socketserver
 import os
 import sys
 from pathlib import Path
 
+import uvicorn
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.routing import Mount
+from starlette.staticfiles import StaticFiles
+
 # Configuration
 PORT = 3001
 DIRECTORY = "static"
 
-class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
-    """Custom handler to serve files from the static directory"""
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory=DIRECTORY, **kwargs)
-    
-    def end_headers(self):
-        # Add CORS headers
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        super().end_headers()
+
+def create_app() -> Starlette:
+    """Build the ASGI app that serves the static directory"""
+    return Starlette(
+        routes=[Mount("/", app=StaticFiles(directory=DIRECTORY, html=True))],
+        middleware=[
+            # Same CORS headers the previous SimpleHTTPRequestHandler sent
+            Middleware(
+                CORSMiddleware,
+                allow_origins=["*"],
+                allow_methods=["GET", "POST", "OPTIONS"],
+                allow_headers=["Content-Type"],
+            )
+        ],
+    )
+
 
 def main():
     """Start the frontend server"""
@@ -36,19 +45,17 @@ def main():
         print(f"Error: {DIRECTORY} directory not found")
         sys.exit(1)
     
-    # Start the server
-    with socketserver.TCPServer(("", PORT), CustomHTTPRequestHandler) as httpd:
-        print(f"🌐 TOBI Frontend Server starting...")
-        print(f"📍 Serving at: http://localhost:{PORT}")
-        print(f"📁 Directory: {os.path.abspath(DIRECTORY)}")
-        print(f"🔗 Backend API: http://localhost:8000")
-        print(f"🛑 Press Ctrl+C to stop the server")
-        print("-" * 50)
-        
-        try:
-            httpd.serve_forever()
-        except KeyboardInterrupt:
-            print("\n🛑 Frontend server stopped")
+    print(f"🌐 TOBI Frontend Server starting...")
+    print(f"📍 Serving at: http://localhost:{PORT}")
+    print(f"📁 Directory: {os.path.abspath(DIRECTORY)}")
+    print(f"🔗 Backend API: http://localhost:8000")
+    print(f"🛑 Press Ctrl+C to stop the server")
+    print("-" * 50)
+    
+    # "auto" picks uvloop/httptools when installed (uvicorn[standard]) and
+    # falls back to asyncio/h11 otherwise
+    uvicorn.run(create_app(), host="0.0.0.0", port=PORT, loop="auto", http="auto")
+    print("\n🛑 Frontend server stopped")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -6,18 +6,38 @@ This should be run separately from the main API, typically as a scheduled job
 """
 
 import asyncio
+import functools
 import json
+import logging
 import os
 import sys
+import time
 import argparse
+from logging.handlers import MemoryHandler
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import urlparse
+
+import orjson
 
 # Add the parent directory to path so we can import from src
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.scraper import VodafoneDataScraper
 
+# uvloop is an optional drop-in replacement for the stdlib event loop
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+
+@functools.lru_cache(maxsize=4)
+def _read_json_cached(path: str, mtime: float):
+    """Parse a JSON file; keyed on its mtime, so a rewrite invalidates the entry"""
+    return orjson.loads(Path(path).read_bytes())
+
 
 class ScraperService:
     """Service for managing product scraping operations"""
@@ -26,19 +46,53 @@ class ScraperService:
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
         self.scraper = VodafoneDataScraper()
+        self.logger = self._setup_logger()
+    
+    def _setup_logger(self) -> logging.Logger:
+        """Log to the console and, in batches, to data/scraper.log"""
+        logger = logging.getLogger("scraper_service")
+        logger.setLevel(logging.INFO)
+        # The scraper module configures the root logger; don't log twice
+        logger.propagate = False
+        
+        if not logger.handlers:
+            formatter = logging.Formatter(
+                "[%(asctime)s] %(levelname)s: %(message)s", datefmt="%Y-%m-%dT%H:%M:%S"
+            )
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setFormatter(formatter)
+            
+            # One open file handle for the service's lifetime; records are
+            # buffered and appended in batches (immediately on errors). The
+            # buffer is flushed by logging's shutdown hook at interpreter exit.
+            file_handler = logging.FileHandler(self.data_dir / "scraper.log", mode="a")
+            file_handler.setFormatter(formatter)
+            buffered_file_handler = MemoryHandler(
+                capacity=100, flushLevel=logging.ERROR, target=file_handler
+            )
+            
+            logger.addHandler(console_handler)
+            logger.addHandler(buffered_file_handler)
+        return logger
         
     def log_operation(self, message: str, level: str = "INFO"):
         """Log scraping operations"""
-        timestamp = datetime.now().isoformat()
-        print(f"[{timestamp}] {level}: {message}")
-        
-        # Also log to file
-        log_file = self.data_dir / "scraper.log"
-        with open(log_file, "a") as f:
-            f.write(f"[{timestamp}] {level}: {message}\n")
+        self.logger.log(logging.getLevelName(level), message)
     
-    async def scrape_and_update(self, force: bool = False, limit: int = 0, output_file: str = None) -> bool:
-        """Scrape products and update data files"""
+    async def scrape_and_update(
+        self,
+        force: bool = False,
+        limit: int = 0,
+        output_file: str = None,
+        incremental: bool = False,
+        stream: bool = False,
+    ) -> bool:
+        """
+        Scrape products and update data files. With `incremental`, only product
+        pages missing from the existing products file are scraped, and the new
+        products are added to it. With `stream`, products are written to the
+        file as they are scraped instead of being collected first.
+        """
         self.log_operation("Starting product scraping service")
         
         try:
@@ -47,63 +101,112 @@ class ScraperService:
             should_scrape = force
             
             if not should_scrape and products_file.exists():
-                # Check if data is older than 24 hours
-                file_age = datetime.now().timestamp() - products_file.stat().st_mtime
+                # Check if data is older than 24 hours. An unchanged scrape leaves
+                # products.json as it was but still rewrites the metadata file
+                metadata_file = self.data_dir / "scraper_metadata.json"
+                last_update = products_file.stat().st_mtime
+                if metadata_file.exists():
+                    last_update = max(last_update, metadata_file.stat().st_mtime)
+                file_age = datetime.now().timestamp() - last_update
                 should_scrape = file_age > 86400  # 24 hours in seconds
                 
             if not should_scrape:
                 self.log_operation("Product data is fresh, skipping scrape")
                 return True
             
+            # The existing products file records which pages have been scraped
+            existing_products = []
+            skip_paths = None
+            target_file = Path(output_file or self.scraper.data_file)
+            if incremental and target_file.exists():
+                existing_products = orjson.loads(target_file.read_bytes())
+                skip_paths = {urlparse(product["url"]).path for product in existing_products if product.get("url")}
+                self.log_operation(f"Incremental scrape: skipping {len(skip_paths)} already scraped product pages")
+            
             # Perform scraping
             self.log_operation(f"Scraping products from Vodafone UK (limit: {'None' if limit == 0 else limit})...")
-            products = await self.scraper.scrape_products(limit=limit)
+            if stream:
+                async def all_products():
+                    for product in existing_products:
+                        yield product
+                    async for product in self.scraper.iter_products(limit=limit, skip_paths=skip_paths):
+                        yield product
+                
+                product_count = await self.scraper.save_products_stream(all_products(), filename=output_file)
+                if product_count is None:
+                    self.log_operation("Failed to save scraped products", "ERROR")
+                    return False
+                new_count = product_count - len(existing_products)
+            else:
+                products = await self.scraper.scrape_products(limit=limit, skip_paths=skip_paths)
+                new_count = len(products)
+                product_count = len(existing_products) + new_count
             
-            if not products:
+            if not new_count:
+                if existing_products:
+                    self.log_operation("No new products found")
+                    return True
                 self.log_operation("No products scraped", "ERROR")
                 return False
             
             # Save to the specified (or default) products file
-            success = self.scraper.save_products(products, filename=output_file)
-            if success:
-                self.log_operation(f"Successfully scraped and saved {len(products)} products to {output_file or self.scraper.data_file}")
-                
-                # Save metadata (still using the default metadata file)
-                metadata = {
-                    "last_scraped": datetime.now().isoformat(),
-                    "product_count": len(products),
-                    "scraping_method": "playwright" if self.scraper.playwright_available else "sample",
-                }
-                
-                metadata_file = self.data_dir / "scraper_metadata.json"
-                with open(metadata_file, "w") as f:
-                    json.dump(metadata, f, indent=2)
-                
-                return True
-            else:
+            if not stream and not await self.scraper.save_products_async(existing_products + products, filename=output_file):
                 self.log_operation("Failed to save scraped products", "ERROR")
                 return False
+            
+            self.log_operation(f"Successfully scraped and saved {product_count} products to {output_file or self.scraper.data_file}")
+            
+            # The metadata describes the default products file, so a scrape
+            # saved elsewhere leaves it alone
+            if target_file.resolve() == Path(self.scraper.data_file).resolve():
+                self._save_metadata(
+                    product_count=product_count,
+                    scraping_method="playwright" if self.scraper.playwright_available else "sample",
+                )
+            
+            return True
                 
         except Exception as e:
             self.log_operation(f"Error during scraping: {e}", "ERROR")
             return False
     
+    def _save_metadata(self, product_count: int, scraping_method: str):
+        """Record when and how the product data was last written"""
+        metadata = {
+            "last_scraped": datetime.now().isoformat(),
+            "product_count": product_count,
+            "scraping_method": scraping_method,
+        }
+        
+        metadata_file = self.data_dir / "scraper_metadata.json"
+        tmp_file = metadata_file.with_suffix(".json.tmp")
+        tmp_file.write_bytes(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_file, metadata_file)
+    
     def get_scraping_status(self) -> dict:
         """Get current scraping status and metadata"""
         try:
             metadata_file = self.data_dir / "scraper_metadata.json"
+            metadata_mtime = None
             if metadata_file.exists():
-                with open(metadata_file, "r") as f:
-                    metadata = json.load(f)
+                metadata_mtime = metadata_file.stat().st_mtime
+                # Copy, as the cached dict is shared across calls
+                metadata = dict(_read_json_cached(str(metadata_file), metadata_mtime))
             else:
                 metadata = {}
             
             products_file = self.data_dir / "products.json"
             if products_file.exists():
-                with open(products_file, "r") as f:
-                    products = json.load(f)
-                    product_count = len(products)
-                    file_age = datetime.now().timestamp() - products_file.stat().st_mtime
+                # The metadata written alongside products.json carries its
+                # product count. It is only trusted if products.json hasn't been
+                # rewritten since (e.g. by the search engine); otherwise the file is parsed
+                products_mtime = products_file.stat().st_mtime
+                product_count = None
+                if metadata_mtime is not None and metadata_mtime >= products_mtime:
+                    product_count = metadata.get("product_count")
+                if product_count is None:
+                    product_count = len(_read_json_cached(str(products_file), products_mtime))
+                file_age = time.time() - products_mtime
                     
                 metadata.update({
                     "current_product_count": product_count,
@@ -125,7 +228,13 @@ class ScraperService:
     def update_sample_data(self) -> bool:
         """Update data with sample products (for testing)"""
         self.log_operation("Updating with sample data")
-        return self.scraper.update_sample_data()
+        success = self.scraper.update_sample_data()
+        if success:
+            self._save_metadata(
+                product_count=len(self.scraper.get_sample_products()),
+                scraping_method="sample",
+            )
+        return success
 
 
 async def main():
@@ -137,6 +246,8 @@ async def main():
     parser.add_argument("--limit", type=int, default=0, help="Limit the number of products to scrape (0 for no limit)")
     parser.add_argument("--data-dir", default="data", help="Data directory path")
     parser.add_argument("--output", default=None, help="Output file path for the scraped products")
+    parser.add_argument("--incremental", action="store_true", help="Only scrape products missing from the output file and add them to it")
+    parser.add_argument("--stream", action="store_true", help="Write products to the output file as they are scraped")
     
     args = parser.parse_args()
     
@@ -164,7 +275,17 @@ async def main():
             return 1
     
     # Run scraping
-    success = await service.scrape_and_update(force=args.force, limit=args.limit, output_file=args.output)
+    try:
+        success = await service.scrape_and_update(
+            force=args.force,
+            limit=args.limit,
+            output_file=args.output,
+            incremental=args.incremental,
+            stream=args.stream,
+        )
+    finally:
+        # The scraper keeps its browser open between scrapes
+        await service.scraper.aclose()
     
     if success:
         print("✅ Scraping completed successfully")
@@ -181,4 +302,6 @@ async def main():
 
 
 if __name__ == "__main__":
+    if UVLOOP_AVAILABLE:
+        sys.exit(uvloop.run(main()))
     sys.exit(asyncio.run(main())) 
\ No newline at end of file
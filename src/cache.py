@@ -0,0 +1,58 @@
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Hashable, Iterator, Optional, Tuple
+
+
+class LRUCache(MutableMapping):
+    """
+    A size-bounded mapping that evicts the least recently used entry once
+    `maxsize` is exceeded. If `ttl` (seconds) is given, entries that have not
+    been read or written for that long are dropped as well.
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+
+    def _expiry(self) -> Optional[float]:
+        return time.monotonic() + self.ttl if self.ttl is not None else None
+
+    def _expire(self):
+        """Drop idle entries; the oldest entries sit at the front of the dict."""
+        if self.ttl is None:
+            return
+        now = time.monotonic()
+        while self._data:
+            key, (_, expires_at) = next(iter(self._data.items()))
+            if expires_at > now:
+                break
+            del self._data[key]
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value, expires_at = self._data[key]
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            raise KeyError(key)
+        self._data[key] = (value, self._expiry())
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any):
+        self._data[key] = (value, self._expiry())
+        self._data.move_to_end(key)
+        self._expire()
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __delitem__(self, key: Hashable):
+        del self._data[key]
+
+    def __iter__(self) -> Iterator[Hashable]:
+        self._expire()
+        return iter(list(self._data))
+
+    def __len__(self) -> int:
+        self._expire()
+        return len(self._data)
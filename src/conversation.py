@@ -1,26 +1,34 @@
+import asyncio
+import hashlib
 import os
-import json
 import re
-from typing import Dict, List, Optional, Any
+from collections import Counter, deque
+from itertools import islice
+from typing import AsyncIterator, Deque, Dict, List, Optional, Any, Set, Tuple
 from dataclasses import dataclass, asdict
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import logging
+import time
 
 # OpenAI/LangChain are required dependencies
 try:
     from langchain_openai import ChatOpenAI
-    from langchain.memory import ConversationBufferMemory
     from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
-    from langchain_core.prompts import PromptTemplate, ChatPromptTemplate
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.runnables import Runnable
+    from langchain_core.caches import InMemoryCache
     from langchain.chains import LLMChain
+    import httpx
     import openai
+    import orjson
     from dotenv import load_dotenv
     load_dotenv()
 except ImportError as e:
     raise ImportError(
         f"Required dependencies missing: {e}\n"
         "This is a conversational AI sales bot that requires OpenAI integration.\n"
-        "Install with: poetry add openai langchain python-dotenv"
+        "Install with: poetry add openai langchain orjson python-dotenv"
     )
 
 # OpenAI API key is required
@@ -32,6 +40,7 @@ if not OPENAI_API_KEY:
         "Set your API key in the .env file: OPENAI_API_KEY=your_key_here"
     )
 
+from .cache import LRUCache
 from .product_search import ProductSearchEngine
 from .logging_config import setup_logging
 from .data_provider import data_provider
@@ -43,8 +52,153 @@ CONVERSATION_STATE_ACCESSORIES = "accessories_upsell"
 CONVERSATION_STATE_WATCH = "watch_upsell"
 CONVERSATION_STATE_FINAL = "final"
 
+# Phrases the prompts tell the model to use when moving the conversation on,
+# matched with a single scan of each response. Matching ignores case, as the
+# prompts use some phrases both at the start and in the middle of a sentence
+# (e.g. "Great! Now, let's look at some accessories...").
+_STATE_TRANSITION_RE = re.compile(
+    r"(?P<insurance>Great! Let's get you set up with some insurance\.)"
+    r"|(?P<accessories>Let's look at some accessories for your new phone\.)"
+    r"|(?P<watch>would you like to pair your new phone with a watch\?)"
+    r"|(?P<final>Is there anything else I can help you with today\?)",
+    re.IGNORECASE,
+)
+_STATE_TRANSITIONS = {
+    "insurance": CONVERSATION_STATE_INSURANCE,
+    "accessories": CONVERSATION_STATE_ACCESSORIES,
+    "watch": CONVERSATION_STATE_WATCH,
+    "final": CONVERSATION_STATE_FINAL,
+}
+
+# A markdown link to a web page, i.e. a product recommendation in a response
+_PRODUCT_LINK_RE = re.compile(r"\[[^\]]*?\]\(https?://")
+
+# Number of most recent user/assistant exchanges replayed to the LLM as chat
+# history; older ones are dropped so prompt size stays bounded per turn
+MAX_HISTORY_TURNS = 6
+
+# Turns kept in memory per session; the full transcript is in the session's log
+MAX_TURNS_MEMORY = 200
+
+# In-memory session bounds: least recently used sessions are evicted beyond
+# SESSION_CACHE_MAXSIZE, and sessions idle for SESSION_TTL_SECONDS are dropped
+SESSION_CACHE_MAXSIZE = 10_000
+SESSION_TTL_SECONDS = 3600
+
+# Per-turn part of the prompt for the upsell and final states
+_HISTORY_AND_INPUT_TEMPLATE = """
+            Chat History:
+            {history}
+
+            User: {input}
+            AI:
+            """
+
+# Print LangChain's full prompts and responses when DEBUG is set
+LANGCHAIN_VERBOSE = os.getenv("DEBUG", "").lower() in ("1", "true", "yes")
+
+# Replies to the usual ways of closing a conversation in the final state, as
+# the final prompt tells the model to give them; keys are normalised input
+_THANKS_REPLY = "You're welcome!"
+_GOODBYE_REPLY = "Thank you for chatting with me today. Have a great day!"
+_FINAL_STATE_REPLIES = {
+    "thanks": _THANKS_REPLY,
+    "thank you": _THANKS_REPLY,
+    "no": _GOODBYE_REPLY,
+    "no thanks": _GOODBYE_REPLY,
+    "no thank you": _GOODBYE_REPLY,
+    "that s all": _GOODBYE_REPLY,
+    "thats all": _GOODBYE_REPLY,
+    "that s all thanks": _GOODBYE_REPLY,
+    "that is all": _GOODBYE_REPLY,
+}
+_NON_WORD_RE = re.compile(r"\W+")
+
+# Number of LLM responses cached for exact repeats of a prompt
+LLM_CACHE_MAXSIZE = 1024
+
+# Timeout for each OpenAI API call
+OPENAI_TIMEOUT_SECONDS = 30
+
+# Most search results shown to the model per turn; the initial prompt asks it
+# not to list more than 2-3 products at once
+PROMPT_MAX_PRODUCTS = 3
+
+# Number of serialised product contexts kept, keyed by the products' URLs
+PRODUCT_CONTEXT_CACHE_MAXSIZE = 1024
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def iso_timestamp(ns: int) -> str:
+    """Format a time.time_ns() timestamp as an ISO 8601 UTC string"""
+    return (_EPOCH + timedelta(microseconds=ns // 1000)).isoformat()
+
+
+def parse_iso_timestamp(value: str) -> int:
+    """Inverse of iso_timestamp(), to microsecond precision"""
+    return (datetime.fromisoformat(value) - _EPOCH) // timedelta(microseconds=1) * 1000
+
+
+def _check_session_id(session_id: str):
+    """Rejects client-supplied session ids that could point a log path outside its shard"""
+    if not session_id or "/" in session_id or "\\" in session_id or ".." in session_id:
+        raise ValueError(f"Invalid session id: {session_id!r}")
+
+
+def _session_log_dir(session_id: str) -> str:
+    """
+    Directory holding a session's logs. Sessions are sharded by a hash of
+    their id, as the ids themselves share a common prefix ("session_..."),
+    so no single directory grows with every session.
+    """
+    _check_session_id(session_id)
+    return f"logs/sessions/{hashlib.sha1(session_id.encode()).hexdigest()[:2]}"
+
+
+def _session_log_path(session_id: str, extension: str) -> str:
+    """Path of a session's log file with the given extension (.jsonl or .meta.json)"""
+    return f"{_session_log_dir(session_id)}/{session_id}{extension}"
+
+
+# Shard directories already created by this process
+_created_log_dirs: Set[str] = set()
+
+
+# (session_id, JSONL turn lines, metadata JSON or None if unchanged)
+SessionLogEntry = Tuple[str, bytes, Optional[bytes]]
+
+
+def _write_session_logs(entries: List[SessionLogEntry]):
+    """
+    Appends turns to each session's {id}.jsonl and rewrites {id}.meta.json
+    with the latest metadata. Entries for the same session are combined,
+    so each file is opened once per batch.
+    """
+    turn_lines: Dict[str, List[bytes]] = {}
+    metas: Dict[str, bytes] = {}
+    for session_id, lines, meta_json in entries:
+        turn_lines.setdefault(session_id, []).append(lines)
+        if meta_json is not None:
+            metas[session_id] = meta_json
+    
+    # Ensure each shard directory exists, checking once per process
+    for session_id in turn_lines:
+        log_dir = _session_log_dir(session_id)
+        if log_dir not in _created_log_dirs:
+            os.makedirs(log_dir, exist_ok=True)
+            _created_log_dirs.add(log_dir)
+    
+    for session_id, lines in turn_lines.items():
+        with open(_session_log_path(session_id, ".jsonl"), "ab") as f:
+            f.write(b"".join(lines))
+    for session_id, meta_json in metas.items():
+        with open(_session_log_path(session_id, ".meta.json"), "wb") as f:
+            f.write(meta_json)
 
-@dataclass
+
+@dataclass(slots=True)
 class UserPreferences:
     """User preferences for phone recommendations"""
     budget_min: Optional[float] = None
@@ -60,10 +214,10 @@ class UserPreferences:
             self.features = []
 
 
-@dataclass
+@dataclass(slots=True)
 class ConversationTurn:
     """A single conversation turn"""
-    timestamp: str
+    timestamp: int  # time.time_ns(); formatted with iso_timestamp() when written out
     role: str  # 'user' or 'assistant'
     content: str
     recommendations: List[Dict] = None
@@ -78,56 +232,128 @@ class ConversationSession:
     
     def __init__(self, session_id: str):
         self.session_id = session_id
-        self.turns: List[ConversationTurn] = []
+        self.turns: Deque[ConversationTurn] = deque(maxlen=MAX_TURNS_MEMORY)
+        # Total turns in the session, including any dropped from self.turns
+        self.turn_count = 0
+        self.last_user_message: Optional[str] = None
         self.preferences = UserPreferences()
-        self.created_at = datetime.now().isoformat()
-        self.memory = ConversationBufferMemory(ai_prefix="AI", memory_key="history")
+        self.created_at = time.time_ns()
+        # Exchanges replayed to the LLM, each formatted once when recorded
+        self.history: Deque[str] = deque(maxlen=MAX_HISTORY_TURNS)
+        # The joined history, rebuilt only after a new exchange
+        self._history_text: Optional[str] = ""
         self.state = CONVERSATION_STATE_INITIAL
+        # Session metadata JSON as last written to disk, to skip unchanged rewrites
+        self.saved_meta: Optional[bytes] = None
+        # Tags this session's log records with its id
+        self.logger = logging.LoggerAdapter(logging.getLogger(__name__), {"session_id": session_id})
     
-    def add_turn(self, role: str, content: str, recommendations: List[Dict] = None):
+    def add_turn(self, role: str, content: str, recommendations: List[Dict] = None) -> ConversationTurn:
         """Add a conversation turn"""
         turn = ConversationTurn(
-            timestamp=datetime.now().isoformat(),
+            timestamp=time.time_ns(),
             role=role,
             content=content,
             recommendations=recommendations or []
         )
-        self.turns.append(turn)
+        self.append_turn(turn)
         
         # Update session preferences if provided
         
+        return turn
+    
+    def append_turn(self, turn: ConversationTurn):
+        """Append an existing turn, e.g. one read back from the session log"""
+        self.turns.append(turn)
+        self.turn_count += 1
+        if turn.role == "user":
+            self.last_user_message = turn.content
+        
+    def add_exchange(self, user_message: str, response: str):
+        """Record a user message and the assistant's response as chat history"""
+        self.history.append(f"Human: {user_message}\nAI: {response}")
+        self._history_text = None
+    
+    def get_history(self) -> str:
+        """Format the chat history for the prompt's {history} variable"""
+        if self._history_text is None:
+            self._history_text = "\n".join(self.history)
+        return self._history_text
+        
     def get_context(self, max_turns: int = 10) -> List[Dict]:
         """Get recent conversation context"""
-        recent_turns = self.turns[-max_turns:]
+        recent_turns = reversed(list(islice(reversed(self.turns), max_turns)))
         return [{"role": turn.role, "content": turn.content} for turn in recent_turns]
         
     def get_last_user_message(self) -> Optional[str]:
         """Get the last user message"""
-        for turn in reversed(self.turns):
-            if turn.role == "user":
-                return turn.content
-        return None
+        return self.last_user_message
 
 
 class ConversationManager:
     """Manages the conversation state and logic."""
 
-    def __init__(self, product_search_engine: ProductSearchEngine):
+    def __init__(
+        self,
+        product_search_engine: ProductSearchEngine,
+        http_async_client: Optional[httpx.AsyncClient] = None,
+    ):
         """
         Initializes the ConversationManager.
         - product_search_engine: An instance of ProductSearchEngine.
+        - http_async_client: Optional shared httpx client for the LLM calls.
         """
         self.product_search_engine = product_search_engine
-        self.sessions: Dict[str, ConversationSession] = {}
+        # session_id -> ConversationSession
+        self.sessions = LRUCache(
+            maxsize=SESSION_CACHE_MAXSIZE, ttl=SESSION_TTL_SECONDS
+        )
         self.logger = logging.getLogger(__name__)
-        self.llm = ChatOpenAI(temperature=0.7, model_name="gpt-4o")
+        self.llm = ChatOpenAI(
+            temperature=0.7,
+            model_name="gpt-4o",
+            http_async_client=http_async_client,
+            # Fail a stuck call after OPENAI_TIMEOUT_SECONDS, and give up on
+            # transient errors after a couple of retries rather than holding
+            # the user's request through a long backoff
+            timeout=OPENAI_TIMEOUT_SECONDS,
+            max_retries=2,
+            # Identical prompts (same state, history and input, e.g. the same
+            # opening message in a new session) reuse the earlier response
+            cache=InMemoryCache(maxsize=LLM_CACHE_MAXSIZE),
+        )
         self.data_provider = data_provider
+        # Session log writes are queued for a background task once start() is called
+        self._log_queue: Optional[asyncio.Queue] = None
+        self._log_writer_task: Optional[asyncio.Task] = None
+        # session_id -> number of its log entries queued but not yet written
+        self._pending_log_writes: Counter = Counter()
+        # The prompts are static per state, so each state's chains are built once
+        states = (
+            CONVERSATION_STATE_INITIAL,
+            CONVERSATION_STATE_INSURANCE,
+            CONVERSATION_STATE_ACCESSORIES,
+            CONVERSATION_STATE_WATCH,
+            CONVERSATION_STATE_FINAL,
+        )
+        self._chains = {state: self._create_chain(state) for state in states}
+        self._streaming_chains = {state: self._create_streaming_chain(state) for state in states}
+        # tuple of product URLs -> serialised product context
+        self._product_context_cache = LRUCache(maxsize=PRODUCT_CONTEXT_CACHE_MAXSIZE)
+
+    def _get_prompt_for_state(self, state: str) -> ChatPromptTemplate:
+        """
+        Creates the prompt template for the conversation based on the state.
 
-    def _get_prompt_for_state(self, state: str) -> PromptTemplate:
-        """Creates the prompt template for the conversation based on the state."""
+        Everything that is fixed for a state (persona, guidelines and upsell
+        catalogue) goes in the leading system message, and the per-turn parts
+        (history, product context, user input) follow it. The prompt prefix is
+        therefore identical on every turn in a state, which lets OpenAI's
+        automatic prompt caching reuse it.
+        """
         
         if state == CONVERSATION_STATE_INITIAL:
-            template = """
+            system_template = """
             You are TOBI, a friendly and expert conversational sales assistant for Vodafone UK.
             Your goal is to help customers find the perfect mobile phone and tariff based on their needs and preferences.
 
@@ -144,63 +370,43 @@ class ConversationManager:
 
             Current conversation goal: Understand the customer's mobile phone needs and guide them to the right product.
 
-            Here is some context on products that may be relevant to the user's query:
-            {product_context}
-
             If you recommend products, you MUST use the format:
             [Product Name](Product URL)
-
+            """
+            human_template = """
             Chat History:
             {history}
 
+            Here is some context on products that may be relevant to the user's query:
+            {product_context}
+
             User: {input}
             AI:
             """
-            return PromptTemplate(
-                input_variables=["history", "input", "product_context"],
-                template=template
-            )
         
         elif state == CONVERSATION_STATE_INSURANCE:
-            insurance_plans = self.data_provider.get_insurance_plans()
-            insurance_context = "\n".join([f"- {plan['name']} ({plan['price']}): {plan['description']}" for plan in insurance_plans.values()])
-
-            template = f"""
+            system_template = f"""
             You are TOBI, a friendly and expert conversational sales assistant for Vodafone UK.
             Your current goal is to offer the customer insurance for their new device.
 
             Available Insurance Plans:
-            {insurance_context}
+            {self.data_provider.get_insurance_context()}
 
             Key Guidelines:
             1. Proactively recommend a specific plan based on the user's phone choice. For premium phones, recommend the 'Loss, theft, damage and breakdown cover'.
             2. If the user chooses a plan, confirm their choice and respond with "Great! Now, let's look at some accessories for your new phone."
             3. If the user declines insurance, respond with "No problem. Let's look at some accessories for your new phone."
             4. Keep the tone helpful and not pushy. Do not start your response with a generic greeting.
-
-            Chat History:
-            {{history}}
-
-            User: {{input}}
-            AI:
             """
-            return PromptTemplate(
-                input_variables=["history", "input"],
-                template=template
-            )
+            human_template = _HISTORY_AND_INPUT_TEMPLATE
             
         elif state == CONVERSATION_STATE_ACCESSORIES:
-            accessories = self.data_provider.get_accessories()
-            accessories_context = "\n".join(
-                [f"- {acc['name']} ({acc['price']}): {acc['description']}" for acc in accessories.values()]
-            )
-
-            template = f"""
+            system_template = f"""
             You are TOBI, a friendly and expert conversational sales assistant for Vodafone UK.
             Your current goal is to offer the customer accessories for their new phone.
 
             Available Accessories:
-            {accessories_context}
+            {self.data_provider.get_accessories_context()}
 
             Key Guidelines:
             1. Your absolute first priority is to check if the user has already said no or expressed a negative sentiment. If so, you MUST respond with "No problem. Finally, would you like to pair your new phone with a watch?" and nothing else.
@@ -209,50 +415,27 @@ class ConversationManager:
             4. If the user chooses any accessories, confirm their choice and respond with "Excellent choices! Finally, would you like to pair your new phone with a watch?"
             5. If the user declines, respond with "No problem. Finally, would you like to pair your new phone with a watch?"
             6. Keep the tone helpful and not pushy.
-
-            Chat History:
-            {{history}}
-
-            User: {{input}}
-            AI:
             """
-            return PromptTemplate(
-                input_variables=["history", "input"],
-                template=template
-            )
+            human_template = _HISTORY_AND_INPUT_TEMPLATE
 
         elif state == CONVERSATION_STATE_WATCH:
-            watches = self.data_provider.get_watches()
-            watches_context = "\n".join(
-                [f"- [{watch['name']}]({watch['url']}) ({watch['price']}): {watch['description']}" for watch in watches.values()]
-            )
-
-            template = f"""
+            system_template = f"""
             You are TOBI, a friendly and expert conversational sales assistant for Vodafone UK.
             Your current goal is to offer the customer a watch to pair with their new phone.
 
             Available Watches:
-            {watches_context}
+            {self.data_provider.get_watches_context()}
 
             Key Guidelines:
             1. Offer the watches listed above, making sure to use the markdown format to make them clickable links.
             2. If the user chooses a watch, confirm their choice and respond with "Perfect! We've added that to your order. Is there anything else I can help you with today?"
             3. If the user declines, respond with "No problem at all. Is there anything else I can help you with today?"
             4. This is the final step, so be prepared to end the conversation gracefully.
-
-            Chat History:
-            {{history}}
-
-            User: {{input}}
-            AI:
             """
-            return PromptTemplate(
-                input_variables=["history", "input"],
-                template=template
-            )
+            human_template = _HISTORY_AND_INPUT_TEMPLATE
 
         elif state == CONVERSATION_STATE_FINAL:
-            template = """
+            system_template = """
             You are TOBI, a friendly and expert conversational sales assistant for Vodafone UK.
             The user has indicated they are finished with the conversation. Your goal is to end the conversation politely and naturally.
 
@@ -261,20 +444,17 @@ class ConversationManager:
             2. If the user says a simple "thanks", respond with "You're welcome!".
             3. If they ask another question, answer it helpfully.
             4. Do not try to sell anything else.
+            """
+            human_template = _HISTORY_AND_INPUT_TEMPLATE
 
-            Chat History:
-            {history}
+        else:
+            # Fallback to the initial prompt if state is unknown
+            return self._get_prompt_for_state(CONVERSATION_STATE_INITIAL)
 
-            User: {input}
-            AI:
-            """
-            return PromptTemplate(
-                input_variables=["history", "input"],
-                template=template
-            )
-            
-        # Fallback to the initial prompt if state is unknown
-        return self._get_prompt_for_state(CONVERSATION_STATE_INITIAL)
+        return ChatPromptTemplate.from_messages([
+            ("system", system_template),
+            ("human", human_template),
+        ])
 
 
     def _create_chain(self, state: str) -> LLMChain:
@@ -283,112 +463,315 @@ class ConversationManager:
         return LLMChain(
             llm=self.llm,
             prompt=prompt,
-            verbose=True,
+            verbose=LANGCHAIN_VERBOSE,
         )
 
-    def _get_or_create_session(self, session_id: str) -> ConversationSession:
-        """Retrieves or creates a conversation session for a given session ID."""
-        if session_id not in self.sessions:
-            self.logger.info(f"Creating new conversation session: {session_id}")
-            self.sessions[session_id] = ConversationSession(session_id=session_id)
-        return self.sessions[session_id]
+    def _create_streaming_chain(self, state: str) -> Runnable:
+        """Creates a prompt | llm pipeline for a given state that streams the response text."""
+        return self._get_prompt_for_state(state) | self.llm | StrOutputParser()
 
-    def _save_session_to_file(self, session: ConversationSession):
-        """Saves the conversation session to a file."""
-        session_data = {
+    def _get_product_context(self, recommendations: List[Dict]) -> str:
+        """
+        Serialises recommended products for the prompt. Relevance scores are
+        left out, so the text depends only on which products were found and
+        can be reused whenever the same products come up again.
+        """
+        key = tuple(product.get("url") for product in recommendations)
+        product_context = self._product_context_cache.get(key)
+        if product_context is None:
+            products = [
+                {k: v for k, v in product.items() if k != "score"}
+                for product in recommendations
+            ]
+            # Compact JSON: the model doesn't need the indentation, and it
+            # costs prompt tokens. Sorted keys make the text byte-identical
+            # whichever search path built the product dicts
+            product_context = "Available Products:\n" + orjson.dumps(
+                products, option=orjson.OPT_SORT_KEYS
+            ).decode()
+            self._product_context_cache[key] = product_context
+        return product_context
+
+    async def _get_or_create_session(self, session_id: str) -> ConversationSession:
+        """
+        Retrieves the conversation session for a given session ID. Sessions
+        evicted from memory are restored from their logs; otherwise a new
+        session is created.
+        """
+        session = self.sessions.get(session_id)
+        if session is not None:
+            return session
+        
+        # The id is used to build log paths, for writing and for restoring
+        _check_session_id(session_id)
+        
+        # Make sure the session's logs are complete before reading them back
+        if self._pending_log_writes[session_id]:
+            await self._log_queue.join()
+        try:
+            session = await asyncio.to_thread(self._load_session_from_file, session_id)
+        except Exception as e:
+            self.logger.warning(
+                "Could not restore session from its logs: %s", e, extra={"session_id": session_id}
+            )
+            session = None
+        
+        # A concurrent request may have stored the session while this one was
+        # waiting; keep that one so neither request's turns are lost
+        existing = self.sessions.get(session_id)
+        if existing is not None:
+            return existing
+        
+        if session is None:
+            session = ConversationSession(session_id=session_id)
+            session.logger.info("Creating new conversation session")
+        else:
+            session.logger.info("Restored conversation session from logs")
+        self.sessions[session_id] = session
+        return session
+
+    def _load_session_from_file(self, session_id: str) -> Optional[ConversationSession]:
+        """Rebuilds a session from its JSONL and metadata logs, or returns None if it has none"""
+        meta_path = _session_log_path(session_id, ".meta.json")
+        turns_path = _session_log_path(session_id, ".jsonl")
+        if not os.path.exists(meta_path):
+            return None
+        
+        with open(meta_path, "rb") as f:
+            meta_json = f.read()
+        meta = orjson.loads(meta_json)
+        session = ConversationSession(session_id=session_id)
+        session.created_at = parse_iso_timestamp(meta["created_at"])
+        session.state = meta["state"]
+        session.preferences = UserPreferences(**meta["preferences"])
+        session.saved_meta = meta_json
+        
+        if os.path.exists(turns_path):
+            user_message = None
+            with open(turns_path, "rb") as f:
+                for line in f:
+                    data = orjson.loads(line)
+                    turn = ConversationTurn(
+                        timestamp=parse_iso_timestamp(data["timestamp"]),
+                        role=data["role"],
+                        content=data["content"],
+                        recommendations=data["recommendations"],
+                    )
+                    session.append_turn(turn)
+                    # Pair each user message with the response that followed it
+                    if turn.role == "user":
+                        user_message = turn.content
+                    elif user_message is not None:
+                        session.add_exchange(user_message, turn.content)
+                        user_message = None
+        return session
+
+    def _session_log_entry(self, session: ConversationSession, turns: List[ConversationTurn]) -> SessionLogEntry:
+        """
+        Serialises new turns for the session's JSONL log, one JSON object per
+        line, plus the session metadata if the state or preferences have
+        changed since it was last written (None otherwise).
+        """
+        turn_lines = b"".join(
+            orjson.dumps(
+                {
+                    "timestamp": iso_timestamp(turn.timestamp),
+                    "role": turn.role,
+                    "content": turn.content,
+                    "recommendations": turn.recommendations,
+                },
+                option=orjson.OPT_APPEND_NEWLINE,
+            )
+            for turn in turns
+        )
+        
+        # orjson encodes the preferences dataclass directly, without asdict()
+        meta_json = orjson.dumps({
             "session_id": session.session_id,
-            "created_at": session.created_at,
+            "created_at": iso_timestamp(session.created_at),
             "state": session.state,
-            "preferences": asdict(session.preferences),
-            "turns": [asdict(turn) for turn in session.turns]
-        }
-        
-        # Ensure the logs/sessions directory exists
-        os.makedirs("logs/sessions", exist_ok=True)
+            "preferences": session.preferences,
+        })
+        if meta_json == session.saved_meta:
+            meta_json = None
+        else:
+            session.saved_meta = meta_json
         
-        file_path = f"logs/sessions/{session.session_id}.json"
-        with open(file_path, "w") as f:
-            json.dump(session_data, f, indent=2)
+        return session.session_id, turn_lines, meta_json
+
+    async def start(self):
+        """Starts the background task that writes session logs"""
+        self._log_queue = asyncio.Queue()
+        self._log_writer_task = asyncio.create_task(self._session_log_writer())
+
+    async def aclose(self):
+        """Writes out any queued session logs and stops the background writer"""
+        if self._log_writer_task is None:
+            return
+        await self._log_queue.join()
+        self._log_writer_task.cancel()
+        try:
+            await self._log_writer_task
+        except asyncio.CancelledError:
+            pass
+        self._log_queue = None
+        self._log_writer_task = None
+
+    async def _session_log_writer(self):
+        """Writes queued session logs in batches, off the event loop"""
+        while True:
+            entries = [await self._log_queue.get()]
+            while not self._log_queue.empty():
+                entries.append(self._log_queue.get_nowait())
+            try:
+                await asyncio.to_thread(_write_session_logs, entries)
+            except Exception as e:
+                self.logger.error("Error writing session logs: %s", e, exc_info=True)
+            finally:
+                for session_id, _, _ in entries:
+                    self._pending_log_writes[session_id] -= 1
+                    if not self._pending_log_writes[session_id]:
+                        del self._pending_log_writes[session_id]
+                    self._log_queue.task_done()
+
+    def _canned_reply(self, session: ConversationSession, message: str) -> Optional[str]:
+        """Returns a fixed reply for a closing message in the final state, if there is one."""
+        if session.state != CONVERSATION_STATE_FINAL:
+            return None
+        return _FINAL_STATE_REPLIES.get(_NON_WORD_RE.sub(" ", message.lower()).strip())
+
+    async def _prepare_turn(self, session: ConversationSession, message: str) -> Tuple[str, Dict[str, Any], List[Dict]]:
+        """
+        Works out which state's chain answers the message and its inputs.
+        Returns the prompt state, the chain inputs and any recommended products.
+        """
+        # Use the chain for the current state, falling back to the initial
+        # one if the state is unknown
+        prompt_state = session.state if session.state in self._chains else CONVERSATION_STATE_INITIAL
+        chain_inputs = {
+            "input": message,
+            "history": session.get_history(),
+        }
 
-    def process_message(self, message: str, session_id: str) -> Dict[str, Any]:
+        # Search for relevant products only in the initial state, the only
+        # prompt that takes a product context
+        recommendations = []
+        if prompt_state == CONVERSATION_STATE_INITIAL:
+            recommendations = await self.product_search_engine.asearch(message)
+            product_context = "No products found matching the query."
+            if recommendations:
+                product_context = self._get_product_context(recommendations[:PROMPT_MAX_PRODUCTS])
+            chain_inputs["product_context"] = product_context
+
+        return prompt_state, chain_inputs, recommendations
+
+    async def _complete_turn(
+        self, session: ConversationSession, message: str, response_text: str, recommendations: List[Dict]
+    ):
+        """Applies the response's state transition and records the exchange."""
+        # State transition logic
+        transition = _STATE_TRANSITION_RE.search(response_text)
+        if transition:
+            session.state = _STATE_TRANSITIONS[transition.lastgroup]
+
+        # Save the exchange to the chat history
+        session.add_exchange(message, response_text)
+
+        # Only associate recommendations with the turn if the response contains a product link
+        logged_recommendations = []
+        if _PRODUCT_LINK_RE.search(response_text):
+            logged_recommendations = recommendations
+
+        new_turns = [
+            session.add_turn('user', message),
+            session.add_turn('assistant', response_text, recommendations=logged_recommendations),
+        ]
+
+        # Hand the session log to the background writer, so the response
+        # doesn't wait on disk
+        log_entry = self._session_log_entry(session, new_turns)
+        if self._log_queue is not None:
+            self._pending_log_writes[session.session_id] += 1
+            self._log_queue.put_nowait(log_entry)
+        else:
+            await asyncio.to_thread(_write_session_logs, [log_entry])
+
+    async def process_message(self, message: str, session_id: str) -> Dict[str, Any]:
         """Processes a user message and returns the response."""
         try:
-            self.logger.info(
-                f"User Request: {message}",
-                extra={'session_id': session_id, 'user_message': message}
-            )
-            
-            session = self._get_or_create_session(session_id)
+            session = await self._get_or_create_session(session_id)
+            session.logger.info("User Request: %s", message)
 
-            # Search for relevant products only in the initial state
+            response_text = self._canned_reply(session, message)
             recommendations = []
-            product_context = "No products found matching the query."
-            if session.state == CONVERSATION_STATE_INITIAL:
-                recommendations = self.product_search_engine.search(message)
-                if recommendations:
-                    product_context = f"Available Products:\n{json.dumps(recommendations, indent=2)}"
-
-            history = session.memory.load_memory_variables({})['history']
-
-            # Create a chain for the current state
-            chain = self._create_chain(session.state)
-
-            # Invoke the chain with the message and product context
-            response = chain.invoke({
-                "input": message,
-                "product_context": product_context,
-                "history": history
-            })
-            
-            response_text = response['text']
-
-            # State transition logic
-            if "Great! Let's get you set up with some insurance." in response_text:
-                session.state = CONVERSATION_STATE_INSURANCE
-            elif "Let's look at some accessories for your new phone." in response_text:
-                session.state = CONVERSATION_STATE_ACCESSORIES
-            elif "would you like to pair your new phone with a watch?" in response_text.lower():
-                session.state = CONVERSATION_STATE_WATCH
-            elif "Is there anything else I can help you with today?" in response_text:
-                session.state = CONVERSATION_STATE_FINAL
+            if response_text is None:
+                prompt_state, chain_inputs, recommendations = await self._prepare_turn(session, message)
+                response = await self._chains[prompt_state].ainvoke(chain_inputs)
+                response_text = response['text']
 
-            # Save context to memory
-            session.memory.save_context({"input": message}, {"output": response_text})
-
-            # Only associate recommendations with the turn if the response contains a product link
-            logged_recommendations = []
-            if re.search(r'\[.*?\]\(https?://', response_text):
-                logged_recommendations = recommendations
-
-            session.add_turn('user', message)
-            session.add_turn('assistant', response_text, recommendations=logged_recommendations)
-
-            self._save_session_to_file(session)
+            await self._complete_turn(session, message, response_text, recommendations)
 
             result = {
                 "response": response_text,
                 "recommendations": recommendations
             }
 
-            self.logger.info(
-                "LLM Response",
-                extra={'session_id': session_id, 'llm_response': response_text, 'recommendations': recommendations}
-            )
+            session.logger.info("LLM Response: %s", response_text)
             return result
 
         except Exception as e:
-            self.logger.error(f"Error in process_message for session {session_id}: {e}", exc_info=True)
+            self.logger.error(
+                "Error in process_message: %s", e, exc_info=True, extra={"session_id": session_id}
+            )
             return {"response": "Sorry, I encountered an error. Please try again."}
+
+    async def stream_message(self, message: str, session_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Processes a user message like process_message, but yields the response
+        while it is generated:
+        - {"type": "token", "content": ...} for each piece of response text
+        - {"type": "done", "recommendations": [...], "state": ...} once the
+          whole response is in and the turn has been recorded
+        - {"type": "error", "response": ...} if processing fails
+        """
+        try:
+            session = await self._get_or_create_session(session_id)
+            session.logger.info("User Request (streaming): %s", message)
+
+            response_text = self._canned_reply(session, message)
+            recommendations = []
+            if response_text is None:
+                prompt_state, chain_inputs, recommendations = await self._prepare_turn(session, message)
+                chunks = []
+                async for chunk in self._streaming_chains[prompt_state].astream(chain_inputs):
+                    if chunk:
+                        chunks.append(chunk)
+                        yield {"type": "token", "content": chunk}
+                response_text = "".join(chunks)
+            else:
+                yield {"type": "token", "content": response_text}
+
+            # The transition phrases can span chunks, so only the full text is checked
+            await self._complete_turn(session, message, response_text, recommendations)
+
+            session.logger.info("LLM Response: %s", response_text)
+            yield {"type": "done", "recommendations": recommendations, "state": session.state}
+
+        except Exception as e:
+            self.logger.error(
+                "Error in stream_message: %s", e, exc_info=True, extra={"session_id": session_id}
+            )
+            yield {"type": "error", "response": "Sorry, I encountered an error. Please try again."}
         
     def get_session_info(self, session_id: str) -> Dict:
         """Get information about a conversation session"""
-        if session_id not in self.sessions:
+        session = self.sessions.get(session_id)
+        if session is None:
             return {"error": "Session not found"}
-            
-        session = self.sessions[session_id]
+
         return {
             "session_id": session_id,
-            "created_at": session.created_at,
-            "turns": len(session.turns),
+            "created_at": iso_timestamp(session.created_at),
+            "turns": session.turn_count,
             "preferences": asdict(session.preferences)
         } 
\ No newline at end of file
@@ -1,5 +1,12 @@
+from typing import Dict, Iterable
+
+from .upsell_data import INSURANCE_PLANS, ACCESSORIES, WATCHES, UpsellItem
+
+
+def _as_dicts(items: Iterable[UpsellItem]) -> Dict[str, Dict[str, str]]:
+    # Fresh dicts on every call, so callers can't alter the shared catalogue
+    return {item.key: item.to_dict() for item in items}
 
-from .upsell_data import INSURANCE_PLANS, ACCESSORIES, WATCHES
 
 class DataProvider:
     """
@@ -7,17 +14,45 @@ class DataProvider:
     In this version, it loads data from the local upsell_data.py file.
     """
 
-    def get_insurance_plans(self):
-        """Returns all available insurance plans."""
-        return INSURANCE_PLANS
+    def __init__(self):
+        # The catalogues are static, so their prompt listings are formatted once
+        self._insurance_context = "\n".join(
+            f"- {plan.name} ({plan.price}): {plan.description}" for plan in INSURANCE_PLANS
+        )
+        self._accessories_context = "\n".join(
+            f"- {acc.name} ({acc.price}): {acc.description}" for acc in ACCESSORIES
+        )
+        # Not every watch has a product page to link to
+        self._watches_context = "\n".join(
+            f"- [{watch.name}]({watch.url}) ({watch.price}): {watch.description}"
+            if watch.url else
+            f"- {watch.name} ({watch.price}): {watch.description}"
+            for watch in WATCHES
+        )
+
+    def get_insurance_plans(self) -> Dict[str, Dict[str, str]]:
+        """Returns all available insurance plans, keyed by ID."""
+        return _as_dicts(INSURANCE_PLANS)
+
+    def get_accessories(self) -> Dict[str, Dict[str, str]]:
+        """Returns all available accessories, keyed by ID."""
+        return _as_dicts(ACCESSORIES)
+
+    def get_watches(self) -> Dict[str, Dict[str, str]]:
+        """Returns all available watches, keyed by ID."""
+        return _as_dicts(WATCHES)
+
+    def get_insurance_context(self) -> str:
+        """Returns the insurance plans formatted as a prompt listing."""
+        return self._insurance_context
 
-    def get_accessories(self):
-        """Returns all available accessories."""
-        return ACCESSORIES
+    def get_accessories_context(self) -> str:
+        """Returns the accessories formatted as a prompt listing."""
+        return self._accessories_context
 
-    def get_watches(self):
-        """Returns all available watches."""
-        return WATCHES
+    def get_watches_context(self) -> str:
+        """Returns the watches formatted as a prompt listing."""
+        return self._watches_context
 
 # Create a singleton instance of the data provider
 data_provider = DataProvider() 
\ No newline at end of file
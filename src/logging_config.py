@@ -1,16 +1,9 @@
 import logging
 import sys
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import MemoryHandler, TimedRotatingFileHandler
 
 def setup_logging(log_level: str = "INFO"):
     """Set up logging for the application."""
-    
-    # Define a filter that adds session_id to records if it's missing
-    class SessionIdFilter(logging.Filter):
-        def filter(self, record):
-            if not hasattr(record, 'session_id'):
-                record.session_id = 'N/A'
-            return True
 
     # Get the root logger
     logger = logging.getLogger()
@@ -20,13 +13,14 @@ def setup_logging(log_level: str = "INFO"):
     if logger.hasHandlers():
         logger.handlers.clear()
         
-    # Create a formatter
+    # Create a formatter; records logged without a session_id show N/A
     formatter = logging.Formatter(
-        '%(asctime)s - %(levelname)s - [%(session_id)s] - %(message)s'
+        '%(asctime)s - %(levelname)s - [%(session_id)s] - %(message)s',
+        defaults={'session_id': 'N/A'},
     )
     
     # Create a console handler
-    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler = logging.StreamHandler(sys.stderr)
     console_handler.setFormatter(formatter)
     
     # Create a rotating file handler
@@ -35,12 +29,12 @@ def setup_logging(log_level: str = "INFO"):
     )
     file_handler.setFormatter(formatter)
     
-    # Add the filter to both handlers
-    console_handler.addFilter(SessionIdFilter())
-    file_handler.addFilter(SessionIdFilter())
-    
-    # Add handlers to the logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    # Buffer records and write them out in batches of 100, so request handling
+    # doesn't wait on a stream write per log line; warnings and errors are
+    # written out (with everything buffered before them) straight away
+    for handler in (console_handler, file_handler):
+        logger.addHandler(
+            MemoryHandler(capacity=100, flushLevel=logging.WARNING, target=handler)
+        )
     
     logging.info("Logging configured.") 
\ No newline at end of file
@@ -1,10 +1,13 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+import httpx
+import json
 import os
 from dotenv import load_dotenv
 import logging
 from contextlib import asynccontextmanager
+from typing import Optional
 
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
@@ -24,7 +27,7 @@ logger = logging.getLogger(__name__)
 
 # --- Global Variables ---
 # This will be initialized during the lifespan startup event
-conversation_manager: ConversationManager
+conversation_manager: Optional[ConversationManager] = None
 
 
 def _parse_cors_allow_origins(raw: str) -> list[str]:
@@ -38,23 +41,44 @@ CORS_ALLOW_ORIGINS = _parse_cors_allow_origins(
 )
 RATE_LIMIT_DEFAULT = os.getenv("RATE_LIMIT_DEFAULT", "60/minute")
 RATE_LIMIT_CHAT = os.getenv("RATE_LIMIT_CHAT", "20/minute")
+# Where rate-limit counters are kept. The in-memory default is per process, so
+# with several workers point this at a shared store, e.g. redis://host:6379
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
 
 # SlowAPI limiter
-limiter = Limiter(key_func=get_remote_address, default_limits=[RATE_LIMIT_DEFAULT])
+limiter = Limiter(
+    key_func=get_remote_address,
+    default_limits=[RATE_LIMIT_DEFAULT],
+    storage_uri=RATE_LIMIT_STORAGE_URI,
+)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handles application startup and shutdown events."""
     global conversation_manager
+    # One connection pool for all OpenAI traffic (LLM and query embeddings),
+    # so requests reuse warm TCP/TLS connections instead of opening new ones
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+        timeout=30,
+    )
     try:
         logger.info("TOBI Backend API starting up...")
-        product_search_engine = ProductSearchEngine()
-        conversation_manager = ConversationManager(product_search_engine=product_search_engine)
+        product_search_engine = ProductSearchEngine(http_async_client=http_client)
+        conversation_manager = ConversationManager(
+            product_search_engine=product_search_engine,
+            http_async_client=http_client,
+        )
+        await conversation_manager.start()
         logger.info("Product search engine and conversation manager initialized.")
         yield
     except Exception as e:
         logger.critical(f"A critical error occurred during startup: {e}", exc_info=True)
     finally:
+        if conversation_manager is not None:
+            # Flush session logs still queued for writing
+            await conversation_manager.aclose()
+        await http_client.aclose()
         logger.info("TOBI Backend API shutting down...")
 
 app = FastAPI(
@@ -108,7 +132,7 @@ def health_check():
 async def chat(request: Request, chat_request: ChatRequest):
     """Main chat endpoint (rate-limited)."""
     try:
-        result = conversation_manager.process_message(
+        result = await conversation_manager.process_message(
             chat_request.message,
             chat_request.session_id,
         )
@@ -126,6 +150,24 @@ async def chat(request: Request, chat_request: ChatRequest):
         )
 
 
+@app.post("/chat/stream")
+@limiter.limit(RATE_LIMIT_CHAT)
+async def chat_stream(request: Request, chat_request: ChatRequest):
+    """
+    Streaming chat endpoint (rate-limited). Sends the response as server-sent
+    events while it is generated: "token" events carry pieces of the text, and
+    a final "done" event carries the recommendations and conversation state.
+    """
+    async def event_stream():
+        async for event in conversation_manager.stream_message(
+            chat_request.message,
+            chat_request.session_id,
+        ):
+            yield f"data: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @app.get("/products")
 async def get_products():
     """Get all loaded products"""
@@ -164,13 +206,29 @@ async def get_stats():
 
 if __name__ == "__main__":
     import uvicorn
+
+    # Each worker is a separate process with its own lifespan, so every worker
+    # builds its own ConversationManager. Sessions live in process memory, so
+    # WEB_CONCURRENCY > 1 needs sticky routing (or a shared session store), and
+    # RATE_LIMIT_STORAGE_URI should point at a store shared by the workers.
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+
     print("🤖 TOBI Backend API")
     print("=" * 40)
-    print(f"📱 OpenAI available: {conversation_manager.openai_available}")
-    print(f"📦 Products loaded: {len(conversation_manager.search_engine.products)}")
+    print(f"👷 Workers: {workers}")
     print("\n🚀 Starting server...")
     print("📍 Backend API: http://localhost:8000")
     print("📖 API Documentation: http://localhost:8000/docs")
     print("🛑 Press Ctrl+C to stop")
     
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    # "auto" selects uvloop and httptools when installed (uvicorn[standard])
+    # and falls back to the stdlib asyncio loop and h11 parser otherwise.
+    # Multi-worker mode requires an import string rather than the app object.
+    uvicorn.run(
+        "src.main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        loop="auto",
+        http="auto",
+    )
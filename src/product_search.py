@@ -1,20 +1,25 @@
-import json
+import bisect
+import contextlib
+import hashlib
 import os
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict, field
+import tempfile
+from typing import Dict, List, Optional, Any, Set
+from dataclasses import dataclass, field
 import re
 
 # OpenAI and numpy are required for semantic search
 try:
     import numpy as np
-    from openai import OpenAI
+    import httpx
+    import orjson
+    from openai import AsyncOpenAI, OpenAI
     from dotenv import load_dotenv
     load_dotenv()
 except ImportError as e:
     raise ImportError(
         f"Required dependencies missing: {e}\n"
         "This conversational sales bot requires OpenAI integration for product search.\n"
-        "Install with: poetry add openai numpy python-dotenv"
+        "Install with: poetry add openai numpy orjson python-dotenv"
     )
 
 # OpenAI API key is required
@@ -26,6 +31,145 @@ if not OPENAI_API_KEY:
         "Set your API key in the .env file: OPENAI_API_KEY=your_key_here"
     )
 
+from .cache import LRUCache
+
+# Numba is optional; when installed it JIT-compiles the candidate scan
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# SimSIMD is optional; when installed its fused SIMD kernel scores the
+# embeddings instead of a matrix-vector product (Numba's, or else BLAS)
+try:
+    import simsimd
+    SIMSIMD_AVAILABLE = True
+except ImportError:
+    SIMSIMD_AVAILABLE = False
+
+# SimSIMD scores half-precision vectors natively (accumulating in float32), so
+# with it the embeddings are stored in float16, halving the memory scanned per
+# query. NumPy has no half-precision BLAS and would upcast them on every query,
+# so without it they stay float32.
+EMBEDDING_DTYPE = np.float16 if SIMSIMD_AVAILABLE else np.float32
+
+# Normalised product embeddings, memory-mapped on load, with a sidecar that
+# records their count, dimension and dtype
+EMBEDDINGS_FILE = os.path.join("data", "product_embeddings.npy")
+EMBEDDINGS_META_FILE = os.path.join("data", "product_embeddings.meta.json")
+# Embeddings cached as JSON by earlier versions; converted on first load
+LEGACY_EMBEDDINGS_FILE = os.path.join("data", "product_embeddings.json")
+# Product texts sent per embeddings request (the API accepts up to 2048)
+EMBEDDING_BATCH_SIZE = 256
+# Query embeddings kept in memory, so repeated searches skip the API call
+QUERY_EMBEDDING_CACHE_MAXSIZE = 1024
+
+_TOKEN_RE = re.compile(r"\w+")
+# Name keywords identifying each brand; when a name matches several brands,
+# the one listed first wins
+_BRAND_KEYWORDS = {
+    "Apple": ("iphone", "apple"),
+    "Samsung": ("samsung", "galaxy"),
+    "Google": ("google", "pixel"),
+    "OnePlus": ("oneplus",),
+}
+_BRAND_BY_KEYWORD = {keyword: brand for brand, keywords in _BRAND_KEYWORDS.items() for keyword in keywords}
+_BRAND_PRIORITY = {brand: i for i, brand in enumerate(_BRAND_KEYWORDS)}
+# Finds every brand keyword in a single pass over the name
+_BRAND_KEYWORD_RE = re.compile("|".join(map(re.escape, _BRAND_BY_KEYWORD)))
+
+# Whole-pound amount in a monthly cost such as "£35.00/month"
+_PRICE_RE = re.compile(r'£?(\d+)')
+
+# Data allowance buckets a product falls into, as bit flags
+_DATA_UNLIMITED = 1
+_DATA_HEAVY = 2
+_DATA_LIGHT = 4
+# Preferred data usage -> (bucket flag, score for a product in that bucket)
+_DATA_USAGE_SCORES = {
+    'unlimited': (_DATA_UNLIMITED, 8),
+    'heavy': (_DATA_HEAVY, 6),
+    'light': (_DATA_LIGHT, 6),
+}
+# Pads the per-product suffix id rows; sorts after every real id
+_SUFFIX_ID_PAD = np.iinfo(np.int32).max
+
+
+def _match_suffix_ranges_numpy(product_suffix_ids, lows, highs, out):
+    """Flags products holding a suffix id inside any of the [low, high) ranges."""
+    out[:] = False
+    for low, high in zip(lows, highs):
+        out |= ((product_suffix_ids >= low) & (product_suffix_ids < high)).any(axis=1)
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _match_suffix_ranges_numba(product_suffix_ids, lows, highs, out):
+        """Numba version of _match_suffix_ranges_numpy; rows must be sorted."""
+        for i in prange(product_suffix_ids.shape[0]):
+            row = product_suffix_ids[i]
+            hit = False
+            for t in range(lows.shape[0]):
+                pos = np.searchsorted(row, lows[t])
+                if pos < row.shape[0] and row[pos] < highs[t]:
+                    hit = True
+                    break
+            out[i] = hit
+
+    _match_suffix_ranges = _match_suffix_ranges_numba
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _dot_rows_numba(matrix, vector, out):
+        """out[i] = matrix[i] . vector, fusing each row's dot product into one pass."""
+        for i in prange(matrix.shape[0]):
+            total = np.float32(0.0)
+            for j in range(matrix.shape[1]):
+                total += matrix[i, j] * vector[j]
+            out[i] = total
+else:
+    _match_suffix_ranges = _match_suffix_ranges_numpy
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, highest first, with ties in index order
+    as a stable sort would give; only the selected indices are sorted.
+    """
+    n = len(scores)
+    kth = np.partition(scores, n - k)[n - k]
+    above = np.flatnonzero(scores > kth)
+    top = np.concatenate((above, np.flatnonzero(scores == kth)[:k - above.size]))
+    return top[np.lexsort((top, -scores[top]))]
+
+
+
+def _texts_digest(texts: Optional[List[str]]) -> str:
+    """SHA-256 of the embedded texts, identifying which catalogue a cached embedding matrix belongs to."""
+    digest = hashlib.sha256()
+    for text in texts or ():
+        digest.update(text.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _write_atomically(path: str, write) -> None:
+    """
+    Writes `path` through a uniquely named temporary file in the same directory
+    and swaps it in, so concurrent writers such as several workers never write
+    to the same partial file.
+    """
+    directory, name = os.path.split(path)
+    tmp = tempfile.NamedTemporaryFile(dir=directory or ".", prefix=name + ".", suffix=".tmp", delete=False)
+    try:
+        with tmp:
+            write(tmp)
+        os.replace(tmp.name, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp.name)
+        raise
+
 
 @dataclass
 class Product:
@@ -39,42 +183,79 @@ class Product:
     device_cost: Optional[float] = None
 
     def __post_init__(self):
-        """Sets the brand based on the product name."""
-        name_lower = self.name.lower()
-        if "iphone" in name_lower or "apple" in name_lower:
-            self.brand = "Apple"
-        elif "samsung" in name_lower or "galaxy" in name_lower:
-            self.brand = "Samsung"
-        elif "google" in name_lower or "pixel" in name_lower:
-            self.brand = "Google"
-        elif "oneplus" in name_lower:
-            self.brand = "OnePlus"
-        else:
-            self.brand = "Unknown"
+        """Sets the brand based on the product name and builds the search text."""
+        brands = {_BRAND_BY_KEYWORD[keyword] for keyword in _BRAND_KEYWORD_RE.findall(self.name.lower())}
+        self.brand = min(brands, key=_BRAND_PRIORITY.__getitem__, default="Unknown")
+        self._searchable_text = f"{self.name} {self.brand} {self.description} {' '.join(self.features)}"
 
     def to_dict(self) -> Dict:
         """Convert to dictionary"""
-        return asdict(self)
+        # Built by hand rather than with asdict(), which walks and deep-copies
+        # every field reflectively
+        return {
+            "name": self.name,
+            "description": self.description,
+            "url": self.url,
+            "storage_options": list(self.storage_options),
+            "brand": self.brand,
+            "features": list(self.features),
+            "device_cost": self.device_cost,
+        }
     
     def get_searchable_text(self) -> str:
         """Get text for search indexing"""
-        return f"{self.name} {self.brand} {self.description} {' '.join(self.features)}"
+        return self._searchable_text
 
 
 class ProductSearchEngine:
     """Handles product search and management."""
     
-    def __init__(self):
+    def __init__(self, http_async_client: Optional[httpx.AsyncClient] = None):
+        """
+        - http_async_client: Optional shared httpx client for the async OpenAI
+          client, so query embeddings reuse the app's connection pool.
+        """
         self.products: List[Product] = []
         self.openai_client = OpenAI(api_key=OPENAI_API_KEY)
+        self.async_openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=http_async_client)
         self.product_embeddings = None
         self.product_texts = None
+        # Normalised query text -> query embedding
+        self._query_embedding_cache = LRUCache(maxsize=QUERY_EMBEDDING_CACHE_MAXSIZE)
+        # mtime of products.json when self.products was last parsed from it
+        self._products_mtime: Optional[float] = None
+        # Text index: every suffix of every lowercased product token, sorted so
+        # that a prefix (i.e. substring) lookup is a contiguous range of ids, and
+        # a padded matrix of the sorted suffix ids each product contains
+        self._suffix_keys: List[str] = []
+        self._product_suffix_ids = np.empty((0, 0), dtype=np.int32)
+        # Serialised products (Product.to_dict()), parallel to self.products
+        self._product_dicts: List[Dict] = []
+        # Lowercased product fields, parallel to self.products
+        self._names_lc: List[str] = []
+        self._brands_lc: List[str] = []
+        self._descriptions_lc: List[str] = []
+        self._features_lc: List[List[str]] = []
+        self._brands_lc_set: Set[str] = set()
+        # Monthly price of each product in whole pounds, None if it has none
+        self._monthly_prices: List[Optional[int]] = []
+        # The same fields as NumPy string arrays for vectorised matching; the
+        # features are flattened, product i's being those from
+        # _feature_offsets[i] up to _feature_offsets[i + 1]
+        self._names_arr = np.empty(0, dtype=np.str_)
+        self._brands_arr = np.empty(0, dtype=np.str_)
+        self._descriptions_arr = np.empty(0, dtype=np.str_)
+        self._features_arr = np.empty(0, dtype=np.str_)
+        self._feature_offsets = np.zeros(1, dtype=np.intp)
+        # Preference-scoring fields: lowercased searchable text and storage,
+        # monthly price (NaN if none) and data allowance bucket flags
+        self._search_texts_arr = np.empty(0, dtype=np.str_)
+        self._storage_arr = np.empty(0, dtype=np.str_)
+        self._monthly_prices_arr = np.empty(0, dtype=np.float64)
+        self._data_flags = np.empty(0, dtype=np.uint8)
         
-        # Load products on initialization
+        # Load products on initialization; this also initializes search
         self.load_products()
-        
-        # Initialize search capabilities
-        self._initialize_search()
     
     def load_products(self) -> bool:
         """Load products from JSON file"""
@@ -85,11 +266,18 @@ class ProductSearchEngine:
             return False
             
         try:
-            with open(data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            mtime = os.path.getmtime(data_file)
+            if self.products and mtime == self._products_mtime:
+                print(f"Product data in {data_file} is unchanged, skipping reload")
+                return True
+            
+            with open(data_file, 'rb') as f:
+                data = orjson.loads(f.read())
                 self.products = [Product(**product) for product in data]
+            self._products_mtime = mtime
             
             print(f"Loaded {len(self.products)} products from {data_file}")
+            self._build_text_index()
             
             # Re-initialize search if products were reloaded
             if self.products:
@@ -99,7 +287,13 @@ class ProductSearchEngine:
             
         except Exception as e:
             print(f"Error loading products: {e}")
+            # Drop everything derived from the previous catalogue too, so lookups
+            # and searches don't keep serving products that are no longer loaded
             self.products = []
+            self._products_mtime = None
+            self.product_texts = None
+            self.product_embeddings = None
+            self._build_text_index()
             return False
     
     def _initialize_search(self):
@@ -109,40 +303,40 @@ class ProductSearchEngine:
             
         try:
             # Create embeddings for all products
-            self.product_texts = [product.get_searchable_text() for product in self.products]
+            product_texts = [product.get_searchable_text() for product in self.products]
+            if (
+                self.product_embeddings is not None
+                and self.product_embeddings.shape[0] == len(self.products)
+                and product_texts == self.product_texts
+            ):
+                # The embeddings already match the products
+                return
+            self.product_texts = product_texts
             
             # Check if we have cached embeddings
-            embeddings_file = os.path.join("data", "product_embeddings.json")
-            if os.path.exists(embeddings_file):
+            cached_embeddings = self._load_cached_embeddings()
+            if cached_embeddings is not None:
+                self.product_embeddings = cached_embeddings
+                print(f"Loaded cached embeddings for {len(self.products)} products")
+                return
+            
+            if os.path.exists(LEGACY_EMBEDDINGS_FILE):
                 try:
-                    with open(embeddings_file, 'r') as f:
-                        cached_data = json.load(f)
-                        if len(cached_data) == len(self.products):
-                            self.product_embeddings = np.array(cached_data)
-                            print(f"Loaded cached embeddings for {len(self.products)} products")
-                            return
+                    with open(LEGACY_EMBEDDINGS_FILE, 'rb') as f:
+                        cached_data = orjson.loads(f.read())
+                    if len(cached_data) == len(self.products):
+                        self.product_embeddings = self._save_embeddings(
+                            self._normalize_embeddings(np.array(cached_data)), self.product_texts
+                        )
+                        print(f"Converted cached embeddings for {len(self.products)} products to {EMBEDDINGS_FILE}")
+                        return
                 except Exception as e:
                     print(f"Error loading cached embeddings: {e}")
             
             # Generate new embeddings
             print("Generating OpenAI embeddings for products...")
-            embeddings = []
-            for text in self.product_texts:
-                try:
-                    response = self.openai_client.embeddings.create(
-                        model="text-embedding-ada-002",
-                        input=text
-                    )
-                    embeddings.append(response.data[0].embedding)
-                except Exception as e:
-                    raise RuntimeError(f"Failed to generate embeddings: {e}")
-            
-            self.product_embeddings = np.array(embeddings)
-            
-            # Cache embeddings
-            os.makedirs("data", exist_ok=True)
-            with open(embeddings_file, 'w') as f:
-                json.dump(self.product_embeddings.tolist(), f)
+            # Cache embeddings, then use the cached copy (see _save_embeddings)
+            self.product_embeddings = self._save_embeddings(self._embed_texts(self.product_texts), self.product_texts)
             
             print(f"OpenAI semantic search initialized with {len(self.products)} products")
             
@@ -153,46 +347,293 @@ class ProductSearchEngine:
                 "Please check your API key and connection."
             )
     
+    def _embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Embeds product texts in batches, returning them normalised"""
+        # Products with identical text (e.g. variants of one model) are
+        # embedded once and share the vector
+        unique_texts = list(dict.fromkeys(texts))
+        unique_ids = {text: i for i, text in enumerate(unique_texts)}
+        
+        embeddings = []
+        for start in range(0, len(unique_texts), EMBEDDING_BATCH_SIZE):
+            try:
+                response = self.openai_client.embeddings.create(
+                    model="text-embedding-ada-002",
+                    input=unique_texts[start:start + EMBEDDING_BATCH_SIZE]
+                )
+                # Each result carries the index of its input
+                embeddings.extend(d.embedding for d in sorted(response.data, key=lambda d: d.index))
+            except Exception as e:
+                raise RuntimeError(f"Failed to generate embeddings: {e}")
+        
+        embeddings = self._normalize_embeddings(np.array(embeddings))
+        return embeddings[[unique_ids[text] for text in texts]]
+    
+    def _load_cached_embeddings(self) -> Optional[np.ndarray]:
+        """
+        Memory-maps the cached embeddings, so startup does no parsing and
+        workers share the pages. Returns None if there is no usable cache for
+        the current products.
+        """
+        if not (os.path.exists(EMBEDDINGS_FILE) and os.path.exists(EMBEDDINGS_META_FILE)):
+            return None
+        try:
+            with open(EMBEDDINGS_META_FILE, 'rb') as f:
+                meta = orjson.loads(f.read())
+            # The vectors must have been computed from exactly these texts; a
+            # catalogue with the same count but different products is re-embedded
+            if meta["n"] != len(self.products) or meta.get("texts_sha256") != _texts_digest(self.product_texts):
+                return None
+            
+            embeddings = np.load(EMBEDDINGS_FILE, mmap_mode='r')
+            if embeddings.shape != (meta["n"], meta["dim"]) or embeddings.dtype != np.dtype(meta["dtype"]):
+                return None
+            # Written by an install with a different EMBEDDING_DTYPE; convert
+            # the cache once rather than keeping a private copy in every worker
+            if embeddings.dtype != EMBEDDING_DTYPE:
+                embeddings = self._save_embeddings(embeddings.astype(EMBEDDING_DTYPE), self.product_texts)
+            return embeddings
+        except Exception as e:
+            print(f"Error loading cached embeddings: {e}")
+            return None
+    
+    def _save_embeddings(self, embeddings: np.ndarray, texts: List[str]) -> np.ndarray:
+        """
+        Writes normalised embeddings of `texts` and their sidecar, each replaced
+        atomically. Returns the written matrix memory-mapped, so the process
+        shares its pages with other workers instead of holding a private copy;
+        mappings of a replaced file stay valid.
+        """
+        os.makedirs("data", exist_ok=True)
+        _write_atomically(EMBEDDINGS_FILE, lambda f: np.save(f, embeddings))
+        
+        meta = {
+            "n": embeddings.shape[0],
+            "dim": embeddings.shape[1],
+            "dtype": embeddings.dtype.name,
+            "texts_sha256": _texts_digest(texts),
+        }
+        _write_atomically(EMBEDDINGS_META_FILE, lambda f: f.write(orjson.dumps(meta)))
+        
+        return np.load(EMBEDDINGS_FILE, mmap_mode='r')
+    
+    @staticmethod
+    def _normalize_embeddings(embeddings: np.ndarray) -> np.ndarray:
+        """
+        Scales each embedding to unit length, so a single matrix-vector
+        product gives the cosine similarity of a query to every product, and
+        stores the result as EMBEDDING_DTYPE.
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        # Leave all-zero rows as they are rather than dividing by zero
+        norms[norms == 0] = 1
+        return (embeddings / norms).astype(EMBEDDING_DTYPE)
+    
+    def _build_text_index(self):
+        """Serialise and lowercase the product fields once and index their token suffixes"""
+        self._product_dicts = [product.to_dict() for product in self.products]
+        self._names_lc = [product.name.lower() for product in self.products]
+        self._brands_lc = [product.brand.lower() for product in self.products]
+        self._descriptions_lc = [product.description.lower() for product in self.products]
+        self._features_lc = [[feature.lower() for feature in product.features] for product in self.products]
+        self._brands_lc_set = set(self._brands_lc)
+        self._monthly_prices = [self._parse_monthly_price(product) for product in self.products]
+        
+        self._names_arr = np.array(self._names_lc, dtype=np.str_)
+        self._brands_arr = np.array(self._brands_lc, dtype=np.str_)
+        self._descriptions_arr = np.array(self._descriptions_lc, dtype=np.str_)
+        self._features_arr = np.array(
+            [feature_lc for features_lc in self._features_lc for feature_lc in features_lc], dtype=np.str_
+        )
+        self._feature_offsets = np.concatenate((
+            [0], np.cumsum([len(features_lc) for features_lc in self._features_lc], dtype=np.intp)
+        )).astype(np.intp)
+        
+        self._search_texts_arr = np.array(
+            [product.get_searchable_text().lower() for product in self.products], dtype=np.str_
+        )
+        self._storage_arr = np.array(
+            [(getattr(product, "storage", None) or "").lower() for product in self.products], dtype=np.str_
+        )
+        self._monthly_prices_arr = np.array(
+            [np.nan if price is None else price for price in self._monthly_prices], dtype=np.float64
+        )
+        self._data_flags = np.array(
+            [self._data_allowance_flags(product) for product in self.products], dtype=np.uint8
+        )
+        
+        product_suffixes = []
+        for idx in range(len(self.products)):
+            fields = [self._names_lc[idx], self._brands_lc[idx], self._descriptions_lc[idx], *self._features_lc[idx]]
+            suffixes = set()
+            for field_text in fields:
+                for token in _TOKEN_RE.findall(field_text):
+                    suffixes.update(token[start:] for start in range(len(token)))
+            product_suffixes.append(suffixes)
+        
+        self._suffix_keys = sorted(set().union(*product_suffixes))
+        suffix_ids = {key: i for i, key in enumerate(self._suffix_keys)}
+        
+        width = max((len(suffixes) for suffixes in product_suffixes), default=0)
+        matrix = np.full((len(product_suffixes), width), _SUFFIX_ID_PAD, dtype=np.int32)
+        for idx, suffixes in enumerate(product_suffixes):
+            ids = sorted(suffix_ids[suffix] for suffix in suffixes)
+            matrix[idx, :len(ids)] = ids
+        self._product_suffix_ids = matrix
+        
+        if NUMBA_AVAILABLE:
+            # Compile the kernel at startup rather than on the first user query
+            no_ranges = np.empty(0, dtype=np.int32)
+            _match_suffix_ranges(matrix, no_ranges, no_ranges, np.zeros(len(matrix), dtype=np.bool_))
+            if not SIMSIMD_AVAILABLE:
+                # The embeddings are served from a read-only memory map
+                embeddings = np.zeros((1, 1), dtype=np.float32)
+                embeddings.flags.writeable = False
+                _dot_rows_numba(embeddings, np.zeros(1, dtype=np.float32), np.empty(1, dtype=np.float32))
+    
+    @staticmethod
+    def _parse_monthly_price(product: Product) -> Optional[int]:
+        """Extract the numeric price from a product's monthly cost, if it has one"""
+        monthly_cost = getattr(product, "monthly_cost", None)
+        if not isinstance(monthly_cost, str):
+            return None
+        price_match = _PRICE_RE.search(monthly_cost)
+        return int(price_match.group(1)) if price_match else None
+    
+    @staticmethod
+    def _data_allowance_flags(product: Product) -> int:
+        """Classify a product's data allowance into the _DATA_* buckets"""
+        allowance = (getattr(product, "data_allowance", None) or "").lower()
+        flags = 0
+        if 'unlimited' in allowance:
+            flags |= _DATA_UNLIMITED
+        if any(word in allowance for word in ['100gb', 'unlimited', '150gb']):
+            flags |= _DATA_HEAVY
+        if any(word in allowance for word in ['1gb', '2gb', '5gb']):
+            flags |= _DATA_LIGHT
+        return flags
+    
+    def _candidate_indices(self, query_lower: str) -> Optional[np.ndarray]:
+        """
+        Return the indices of products that can score for the query, or None if
+        every product has to be scanned.
+        
+        Any substring match of a query word implies each of its word-character
+        runs is a substring of some indexed token, i.e. a prefix of one of the
+        indexed suffixes, so the candidate set never drops a scoring product.
+        """
+        words = query_lower.split()
+        if not words or not all(_TOKEN_RE.search(word) for word in words):
+            return None
+        
+        terms = _TOKEN_RE.findall(query_lower)
+        lows = np.empty(len(terms), dtype=np.int32)
+        highs = np.empty(len(terms), dtype=np.int32)
+        for t, term in enumerate(terms):
+            # Keys starting with `term` sort between `term` and `term` + U+10FFFF
+            lows[t] = bisect.bisect_left(self._suffix_keys, term)
+            highs[t] = bisect.bisect_left(self._suffix_keys, term + "\U0010ffff")
+        
+        hits = np.zeros(len(self.products), dtype=np.bool_)
+        _match_suffix_ranges(self._product_suffix_ids, lows, highs, hits)
+        return np.flatnonzero(hits)
+    
     def search_simple(self, query: str, max_results: int = 5) -> List[Dict]:
         """Simple text-based search"""
         if not query or not self.products:
             return []
         
         query_lower = query.lower()
+        query_words = query_lower.split()
+        
+        indices = self._candidate_indices(query_lower)
+        if indices is None:
+            indices = np.arange(len(self.products))
+        if not indices.size:
+            return []
+        
+        names = self._names_arr[indices]
+        brands = self._brands_arr[indices]
+        
+        # Search in different fields with different weights
+        scores = 5 * (np.char.find(names, query_lower) >= 0)
+        scores += 4 * (np.char.find(brands, query_lower) >= 0)
+        scores += 2 * (np.char.find(self._descriptions_arr[indices], query_lower) >= 0)
+        
+        # Feature matching: 3 points per matching feature. Only the candidates'
+        # features are scanned: gather their positions in the flattened array,
+        # along with the position in `indices` of the product each belongs to
+        starts = self._feature_offsets[indices]
+        counts = self._feature_offsets[indices + 1] - starts
+        owners = np.repeat(np.arange(len(indices)), counts)
+        positions = np.arange(owners.size) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        feature_hits = owners[np.char.find(self._features_arr[positions], query_lower) >= 0]
+        scores += 3 * np.bincount(feature_hits, minlength=len(indices))
+        
+        # Exact brand match gets highest score
+        scores += 10 * (brands == query_lower)
+        
+        # Model name matching
+        if query_words:
+            word_hits = np.zeros(len(indices), dtype=np.bool_)
+            for word in query_words:
+                word_hits |= np.char.find(names, word) >= 0
+            scores += 3 * word_hits
+        
+        scoring = np.flatnonzero(scores > 0)
+        top_k = min(max_results, scoring.size)
+        if top_k <= 0:
+            return []
+        
+        # Highest score first, ties in catalogue order
+        top = _top_k(scores[scoring], top_k)
+        
         results = []
+        for pos in scoring[top]:
+            result = dict(self._product_dicts[indices[pos]])
+            result['score'] = int(scores[pos])
+            results.append(result)
+        return results
+    
+    @staticmethod
+    def _query_cache_key(query: str) -> str:
+        """Queries differing only in case or spacing share a cached embedding"""
+        return " ".join(query.lower().split())
+    
+    def _rank_by_embedding(self, query_embedding: np.ndarray, max_results: int) -> List[Dict]:
+        """Rank products by cosine similarity to a query embedding"""
+        # The product embeddings are unit length, so once the query is too,
+        # their dot products are the cosine similarities
+        query_embedding = np.asarray(query_embedding, dtype=np.float32)
+        query_embedding = query_embedding / np.linalg.norm(query_embedding)
+        product_embeddings = self.product_embeddings[:len(self.products)]
+        if SIMSIMD_AVAILABLE:
+            # cdist needs both operands in the same precision
+            distances = simsimd.cdist(
+                query_embedding[np.newaxis, :].astype(EMBEDDING_DTYPE), product_embeddings, metric="cosine"
+            )
+            similarities = 1 - np.asarray(distances, dtype=np.float32).ravel()
+        elif NUMBA_AVAILABLE:
+            # For NumPy builds without an optimised BLAS
+            similarities = np.empty(len(product_embeddings), dtype=np.float32)
+            _dot_rows_numba(product_embeddings, query_embedding, similarities)
+        else:
+            similarities = product_embeddings @ query_embedding
         
-        for product in self.products:
-            score = 0
-            
-            # Search in different fields with different weights
-            if query_lower in product.name.lower():
-                score += 5
-            if query_lower in product.brand.lower():
-                score += 4
-            if query_lower in product.description.lower():
-                score += 2
-            
-            # Feature matching
-            for feature in product.features:
-                if query_lower in feature.lower():
-                    score += 3
-            
-            # Exact brand match gets highest score
-            if product.brand.lower() == query_lower:
-                score += 10
-            
-            # Model name matching
-            if any(word in product.name.lower() for word in query_lower.split()):
-                score += 3
-            
-            if score > 0:
-                result = product.to_dict()
-                result['score'] = score
-                results.append(result)
-        
-        # Sort by score and return top results
-        results.sort(key=lambda x: x['score'], reverse=True)
-        return results[:max_results]
+        top_k = min(max_results, len(similarities))
+        if top_k <= 0:
+            return []
+        # Highest similarity first, ties in catalogue order
+        top = _top_k(similarities, top_k)
+        
+        results = []
+        for idx in top:
+            result = dict(self._product_dicts[idx])
+            result['score'] = float(similarities[idx])
+            results.append(result)
+        
+        return results
     
     def search_advanced(self, query: str, max_results: int = 5) -> List[Dict]:
         """Advanced semantic search using OpenAI embeddings"""
@@ -200,111 +641,134 @@ class ProductSearchEngine:
             return self.search_simple(query, max_results)
         
         try:
-            # Generate embedding for query
-            response = self.openai_client.embeddings.create(
-                model="text-embedding-ada-002",
-                input=query
-            )
-            query_embedding = np.array(response.data[0].embedding)
-            
-            # Calculate cosine similarity with all products
-            similarities = []
-            for i, product_embedding in enumerate(self.product_embeddings):
-                # Cosine similarity
-                similarity = np.dot(query_embedding, product_embedding) / (
-                    np.linalg.norm(query_embedding) * np.linalg.norm(product_embedding)
+            key = self._query_cache_key(query)
+            query_embedding = self._query_embedding_cache.get(key)
+            if query_embedding is None:
+                # Generate embedding for query
+                response = self.openai_client.embeddings.create(
+                    model="text-embedding-ada-002",
+                    input=query
                 )
-                similarities.append((similarity, i))
-            
-            # Sort by similarity and get top results
-            similarities.sort(key=lambda x: x[0], reverse=True)
-            
-            results = []
-            for similarity, idx in similarities[:max_results]:
-                if idx < len(self.products):
-                    result = self.products[idx].to_dict()
-                    result['score'] = float(similarity)
-                    results.append(result)
-            
-            return results
+                query_embedding = np.array(response.data[0].embedding, dtype=np.float32)
+                self._query_embedding_cache[key] = query_embedding
+            return self._rank_by_embedding(query_embedding, max_results)
             
         except Exception as e:
             print(f"Error in OpenAI search: {e}")
             return self.search_simple(query, max_results)
     
+    def _is_simple_query(self, query: str) -> bool:
+        """
+        Whether text search alone answers the query well: very short queries,
+        and one or two words naming a brand or part of a product name. These
+        skip the embedding request.
+        """
+        query_lower = query.strip().lower()
+        if len(query_lower) < 3:
+            return True
+        if len(query_lower.split()) > 2:
+            return False
+        return query_lower in self._brands_lc_set or bool(
+            (np.char.find(self._names_arr, query_lower) >= 0).any()
+        )
+    
     def search(self, query: str, max_results: int = 5) -> List[Dict]:
         """Main search function - uses OpenAI search if available, otherwise simple"""
+        if self._is_simple_query(query):
+            return self.search_simple(query, max_results)
         return self.search_advanced(query, max_results)
     
+    async def asearch(self, query: str, max_results: int = 5) -> List[Dict]:
+        """Async variant of search() that awaits the query embedding instead of blocking"""
+        if not self.products or self.product_embeddings is None or self._is_simple_query(query):
+            return self.search_simple(query, max_results)
+        
+        try:
+            key = self._query_cache_key(query)
+            query_embedding = self._query_embedding_cache.get(key)
+            if query_embedding is None:
+                response = await self.async_openai_client.embeddings.create(
+                    model="text-embedding-ada-002",
+                    input=query
+                )
+                query_embedding = np.array(response.data[0].embedding, dtype=np.float32)
+                self._query_embedding_cache[key] = query_embedding
+            return self._rank_by_embedding(query_embedding, max_results)
+            
+        except Exception as e:
+            print(f"Error in OpenAI search: {e}")
+            return self.search_simple(query, max_results)
+    
     def search_by_preferences(self, preferences: Dict, max_results: int = 5) -> List[Dict]:
         """Search products based on user preferences"""
         if not self.products:
             return []
         
-        results = []
+        # Lowercase the preferences once; the product fields are lowercased at load
+        brand_preference_lc = (preferences.get('brand_preference') or '').lower()
+        features_lc = [feature.lower() for feature in preferences.get('features', [])]
+        data_usage = preferences.get('data_usage', '').lower()
+        data_usage_flag, data_usage_score = _DATA_USAGE_SCORES.get(data_usage, (0, 0))
+        storage_pref = preferences.get('storage_preference', '').lower()
         
-        for product in self.products:
-            score = 0
-            
-            # Brand preference
-            if preferences.get('brand_preference'):
-                if product.brand.lower() == preferences['brand_preference'].lower():
-                    score += 10
-            
-            # Budget filtering
-            try:
-                # Extract numeric price from monthly cost
-                price_match = re.search(r'£?(\d+)', product.monthly_cost)
-                if price_match:
-                    monthly_price = int(price_match.group(1))
-                    
-                    budget_min = preferences.get('budget_min', 0)
-                    budget_max = preferences.get('budget_max', 1000)
-                    
-                    if budget_min <= monthly_price <= budget_max:
-                        score += 5
-                    elif monthly_price > budget_max:
-                        score -= 5  # Penalize if over budget
-            except:
-                pass
-            
-            # Data usage preference
-            data_usage = preferences.get('data_usage', '').lower()
-            if data_usage == 'unlimited' and 'unlimited' in product.data_allowance.lower():
-                score += 8
-            elif data_usage == 'heavy' and any(word in product.data_allowance.lower() for word in ['100gb', 'unlimited', '150gb']):
-                score += 6
-            elif data_usage == 'light' and any(word in product.data_allowance.lower() for word in ['1gb', '2gb', '5gb']):
-                score += 6
-            
-            # Feature preferences
-            for feature in preferences.get('features', []):
-                if feature.lower() in product.get_searchable_text().lower():
-                    score += 4
-            
-            # Storage preference
-            storage_pref = preferences.get('storage_preference', '').lower()
-            if storage_pref and storage_pref in product.storage.lower():
-                score += 3
-            
-            if score > 0:
-                result = product.to_dict()
-                result['score'] = score
-                results.append(result)
-        
-        # Sort by score and return top results
-        results.sort(key=lambda x: x['score'], reverse=True)
-        return results[:max_results]
+        # Score every product at once
+        scores = np.zeros(len(self.products), dtype=np.int32)
+        
+        # Brand preference
+        if brand_preference_lc:
+            scores += 10 * (self._brands_arr == brand_preference_lc)
+        
+        # Budget filtering; products without a price compare False (NaN)
+        prices = self._monthly_prices_arr
+        try:
+            budget_min = preferences.get('budget_min', 0)
+            budget_max = preferences.get('budget_max', 1000)
+            
+            within_budget = (budget_min <= prices) & (prices <= budget_max)
+            scores += 5 * within_budget
+            scores -= 5 * (~within_budget & (prices > budget_max))  # Penalize if over budget
+        except TypeError:
+            # Budgets that can't be compared with a price (e.g. None) are ignored
+            pass
+        
+        # Data usage preference
+        if data_usage_flag:
+            scores += data_usage_score * ((self._data_flags & data_usage_flag) != 0)
+        
+        # Feature preferences
+        for feature_lc in features_lc:
+            scores += 4 * (np.char.find(self._search_texts_arr, feature_lc) >= 0)
+        
+        # Storage preference
+        if storage_pref:
+            scores += 3 * (np.char.find(self._storage_arr, storage_pref) >= 0)
+        
+        scoring = np.flatnonzero(scores > 0)
+        top_k = min(max_results, scoring.size)
+        if top_k <= 0:
+            return []
+        
+        # Highest score first, ties in catalogue order
+        top = _top_k(scores[scoring], top_k)
+        
+        # Build result dicts only for the top results
+        results = []
+        for idx in scoring[top]:
+            result = dict(self._product_dicts[idx])
+            result['score'] = int(scores[idx])
+            results.append(result)
+        return results
     
     def get_all_products(self) -> List[Dict]:
         """Get all products"""
-        return [product.to_dict() for product in self.products]
+        return [dict(product_dict) for product_dict in self._product_dicts]
     
     def get_product_by_name(self, name: str) -> Optional[Dict]:
         """Get a specific product by name"""
-        for product in self.products:
-            if product.name.lower() == name.lower():
-                return product.to_dict()
+        name_lower = name.lower()
+        for idx, name_lc in enumerate(self._names_lc):
+            if name_lc == name_lower:
+                return dict(self._product_dicts[idx])
         return None
     
     def get_brands(self) -> List[str]:
@@ -314,14 +778,7 @@ class ProductSearchEngine:
     
     def get_price_range(self) -> Dict[str, float]:
         """Get price range of all products"""
-        prices = []
-        for product in self.products:
-            try:
-                price_match = re.search(r'£?(\d+)', product.monthly_cost)
-                if price_match:
-                    prices.append(int(price_match.group(1)))
-            except:
-                continue
+        prices = [price for price in self._monthly_prices if price is not None]
         
         if prices:
             return {
@@ -355,9 +812,19 @@ class ProductSearchEngine:
         try:
             product = Product(**product_data)
             self.products.append(product)
+            self._products_mtime = None  # In-memory catalogue now differs from the file
+            self._build_text_index()
             
-            # Refresh index if advanced search is enabled
-            self._initialize_search()
+            if self.product_embeddings is None:
+                self._initialize_search()
+            else:
+                # Embed just the new product rather than re-indexing the catalogue
+                text = product.get_searchable_text()
+                embedding = self._embed_texts([text])
+                self.product_texts.append(text)
+                self.product_embeddings = self._save_embeddings(
+                    np.vstack([self.product_embeddings, embedding]), self.product_texts
+                )
             
             return True
         except Exception as e:
@@ -372,9 +839,11 @@ class ProductSearchEngine:
         try:
             os.makedirs(os.path.dirname(filename), exist_ok=True)
             
-            products_data = [product.to_dict() for product in self.products]
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(products_data, f, indent=2, ensure_ascii=False)
+            # Write to a temporary file first, so readers never see a partial file
+            tmp_filename = f"{filename}.tmp"
+            with open(tmp_filename, 'wb') as f:
+                f.write(orjson.dumps(self._product_dicts, option=orjson.OPT_INDENT_2))
+            os.replace(tmp_filename, filename)
             
             print(f"Saved {len(self.products)} products to {filename}")
             return True
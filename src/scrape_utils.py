@@ -0,0 +1,104 @@
+import functools
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlparse
+
+# Pure text helpers for the scraper, kept free of Playwright and fully typed
+# so the module can be compiled (e.g. with mypyc) without changing callers.
+
+# A storage capacity such as "128GB" or "1 TB"; captures the number and unit
+STORAGE_RE = re.compile(r'(\d+)\s*(GB|TB)', re.IGNORECASE)
+
+# Proper casing of URL slug words that capitalize() gets wrong, used when a
+# product name has to be rebuilt from its URL
+_BRAND_NAMES: Dict[str, str] = {"oneplus": "OnePlus", "tcl": "TCL", "hmd": "HMD", "zte": "ZTE"}
+_MODEL_WORDS: Dict[str, str] = {"iphone": "iPhone", "4g": "4G", "5g": "5G", "se": "SE", "fe": "FE", "xl": "XL"}
+
+# Plausible device storage sizes, smallest first
+_CANONICAL_STORAGE = ("16GB", "32GB", "64GB", "128GB", "256GB", "512GB", "1TB", "2TB", "4TB")
+# Label for each plausible (value, unit) capacity; 1024GB is reported as 1TB
+_STORAGE_LABELS: Dict[Tuple[int, str], str] = {
+    **{(gb, "GB"): f"{gb}GB" for gb in (16, 32, 64, 128, 256, 512)},
+    (1024, "GB"): "1TB",
+    **{(tb, "TB"): f"{tb}TB" for tb in (1, 2, 4)},
+}
+
+
+@functools.lru_cache(maxsize=128)
+def storage_labels(options: FrozenSet[Tuple[int, str]]) -> Tuple[str, ...]:
+    """Plausible storage labels for a set of (value, unit) capacities, smallest first"""
+    found = {_STORAGE_LABELS[option] for option in options if option in _STORAGE_LABELS}
+    return tuple(label for label in _CANONICAL_STORAGE if label in found)
+
+
+def parse_price(text: str) -> Optional[str]:
+    """
+    Find the first price such as "£1,049.00" in `text` and return its amount
+    without thousands separators ("1049.00"), or None if there is no price.
+    """
+    start = text.find('£')
+    end_of_text = len(text)
+    while start != -1:
+        end = start + 1
+        # Digits and thousands separators, then an optional decimal part
+        while end < end_of_text and (text[end].isdecimal() or text[end] == ','):
+            end += 1
+        if end > start + 1:
+            if end < end_of_text and text[end] == '.':
+                end += 1
+                while end < end_of_text and text[end].isdecimal():
+                    end += 1
+            return text[start + 1:end].replace(',', '')
+        start = text.find('£', end)
+    return None
+
+
+def name_from_url(url: str) -> Optional[str]:
+    """
+    Build a product name such as "Apple iPhone 16 Pro" from a product page URL,
+    or return None if the URL is too short to be a product page.
+    """
+    path_parts = [part for part in urlparse(url).path.split('/') if part]
+    if len(path_parts) < 5:  # e.g., ['mobile', 'phones', 'pay-monthly-contracts', 'apple', 'iphone-16']
+        return None
+    brand_slug = path_parts[-2]
+    brand = _BRAND_NAMES.get(brand_slug, brand_slug.capitalize())
+    model = ' '.join(_MODEL_WORDS.get(word, word.capitalize()) for word in path_parts[-1].split('-'))
+    if model.lower().startswith(brand.lower()):
+        return model
+    return f"{brand} {model}"
+
+
+def filter_product_links(hrefs: Iterable[Optional[str]], page_url: str) -> List[str]:
+    """
+    Resolve the hrefs found on the listing page at `page_url` and keep one
+    absolute URL per product page, in the order they appear.
+    """
+    links: List[str] = []
+    seen_paths: Set[str] = set()
+    listing_path = urlparse(page_url).path
+    # Product cards often repeat the same href; each is only parsed once
+    seen_hrefs: Set[str] = set()
+
+    for href in hrefs:
+        # Ignore links that are clearly not product pages; in-page anchors
+        # resolve to the listing page itself
+        if not href or href in seen_hrefs or href.startswith("#") or "/web-shop/login" in href:
+            continue
+        seen_hrefs.add(href)
+        if href.strip() == page_url:
+            continue
+
+        full_url = urljoin(page_url, href)
+
+        # Normalize URL to use only the path for duplicate checking
+        clean_path = urlparse(full_url).path
+
+        # Ensure we are only adding unique product pages.
+        # A product URL path will typically have more than 5 segments.
+        # e.g., /mobile/phones/pay-monthly-contracts/apple/iphone-16-pro-max
+        if clean_path.count('/') >= 5 and clean_path not in seen_paths and clean_path != listing_path:
+            seen_paths.add(clean_path)
+            links.append(full_url)
+
+    return links
@@ -1,11 +1,17 @@
 import asyncio
-import json
+import filecmp
 import os
 import re
-from typing import List, Dict, Optional, TYPE_CHECKING
-from urllib.parse import urljoin, urlparse
+import sys
+from collections import deque
+from typing import AsyncIterator, Deque, Iterable, List, Dict, Optional, Set, Tuple, TYPE_CHECKING
+from urllib.parse import urlparse
 import logging
 
+import orjson
+
+from .scrape_utils import STORAGE_RE, filter_product_links, name_from_url, parse_price, storage_labels
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -16,9 +22,53 @@ try:
 except ImportError:
     PLAYWRIGHT_AVAILABLE = False
 
+# httpx and BeautifulSoup read server-rendered product pages without a browser
+try:
+    import httpx
+    from bs4 import BeautifulSoup
+    HTTP_SCRAPING_AVAILABLE = True
+except ImportError:
+    HTTP_SCRAPING_AVAILABLE = False
+
 # Import Page only for type checking to avoid runtime errors
 if TYPE_CHECKING:
-    from playwright.async_api import Page
+    from playwright.async_api import Browser, BrowserContext, Page, Playwright, Route
+
+# Maximum number of product pages scraped at the same time
+SCRAPE_CONCURRENCY = 8
+# Seconds allowed for loading and reading a single product page
+PAGE_SCRAPE_TIMEOUT = 20.0
+
+# Seconds allowed for fetching a product page over plain HTTP
+HTTP_SCRAPE_TIMEOUT = 10.0
+_HTTP_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-GB,en;q=0.9",
+}
+_TOTAL_COST_RE = re.compile("Total device cost", re.IGNORECASE)
+
+# Product page links on the listing page
+_PRODUCT_LINK_SELECTOR = 'a[href*="/mobile/phones/pay-monthly-contracts/"]'
+
+# Only the DOM text is scraped, so these requests are aborted
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+_BLOCKED_URL_RE = re.compile(r'google-analytics|googletagmanager|doubleclick|onetrust\.com/consent')
+# Chromium flags for headless runs
+_BROWSER_ARGS = ["--disable-blink-features=AutomationControlled", "--disable-dev-shm-usage"]
+
+def _hidden_in_markup(element) -> bool:
+    """Whether an HTML element or one of its ancestors is hidden by its attributes or inline style"""
+    for tag in (element, *element.parents):
+        attrs = getattr(tag, "attrs", None) or {}
+        if "hidden" in attrs or attrs.get("aria-hidden") == "true":
+            return True
+        style = attrs.get("style", "").replace(" ", "").lower()
+        if "display:none" in style or "visibility:hidden" in style:
+            return True
+    return False
 
 
 class VodafoneDataScraper:
@@ -33,6 +83,13 @@ class VodafoneDataScraper:
         
         self.playwright_available = PLAYWRIGHT_AVAILABLE
         
+        # Browser kept warm across scrapes; launched on first use, see aclose()
+        self._playwright: Optional["Playwright"] = None
+        self._browser: Optional["Browser"] = None
+        self._context: Optional["BrowserContext"] = None
+        self._launch_lock = asyncio.Lock()
+        self._http_client: Optional["httpx.AsyncClient"] = None
+        
         logging.info(f"Scraper initialized:")
         logging.info(f"  - Playwright available: {self.playwright_available}")
     
@@ -49,67 +106,161 @@ class VodafoneDataScraper:
             },
         ]
 
-    async def scrape_products(self, limit: int = 0) -> List[Dict]:
+    async def scrape_products(self, limit: int = 0, skip_paths: Optional[Set[str]] = None) -> List[Dict]:
         """
         Scrape products from Vodafone UK using the best available method.
+        Product pages whose URL path is in `skip_paths` are not scraped.
         """
         if self.playwright_available:
-            return await self.scrape_products_playwright(limit=limit)
+            return await self.scrape_products_playwright(limit=limit, skip_paths=skip_paths)
         else:
             logging.warning("Playwright not available, returning sample products")
             return self.get_sample_products()
 
-    async def scrape_products_playwright(self, limit: int = 0) -> List[Dict]:
-        """Scrape products using Playwright"""
+    async def iter_products(self, limit: int = 0, skip_paths: Optional[Set[str]] = None) -> AsyncIterator[Dict]:
+        """Like scrape_products, but yields each product as soon as it has been scraped."""
+        if self.playwright_available:
+            async for product in self.iter_products_playwright(limit=limit, skip_paths=skip_paths):
+                yield product
+        else:
+            logging.warning("Playwright not available, returning sample products")
+            for product in self.get_sample_products():
+                yield product
+
+    async def scrape_products_playwright(self, limit: int = 0, skip_paths: Optional[Set[str]] = None) -> List[Dict]:
+        """Scrape products using Playwright, skipping pages whose URL path is in `skip_paths`"""
+        return [product async for product in self.iter_products_playwright(limit=limit, skip_paths=skip_paths)]
+
+    async def iter_products_playwright(
+        self, limit: int = 0, skip_paths: Optional[Set[str]] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Scrape products using Playwright, yielding each one in listing order as
+        soon as it has been scraped, so callers can process them as they arrive.
+        """
         if not self.playwright_available:
             raise ImportError("Playwright not available")
         
-        products: List[Dict] = []
+        context = await self._ensure_browser()
+        page = await context.new_page()
+        # Pages being scraped ahead of the caller, oldest first
+        window: Deque[asyncio.Task] = deque()
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=False)
-            page = await browser.new_page()
-            
+        try:
+            logging.info(f"Starting Vodafone UK product scraping from {self.base_url}")
+            # Carry on as soon as the product links are in the DOM, rather
+            # than waiting for analytics and other requests to go quiet
+            await page.goto(self.base_url, wait_until="domcontentloaded")
             try:
-                logging.info(f"Starting Vodafone UK product scraping from {self.base_url}")
-                await page.goto(self.base_url, wait_until="networkidle")
-                await page.wait_for_timeout(3000)
-                
-                await self._handle_cookie_consent(page)
-                
-                product_links = await self._get_product_links(page)
-                logging.info(f"Found {len(product_links)} product links")
-                
-                links_to_scrape = product_links[:limit] if limit > 0 and limit < len(product_links) else product_links
-                
-                for i, link in enumerate(links_to_scrape):
-                    product_page = await browser.new_page()
-                    try:
-                        logging.info(f"Scraping product {i+1}/{len(links_to_scrape)}: {link}")
-                        product_data = await self._scrape_product_page(product_page, link)
-                        if product_data:
-                            products.append(product_data)
-                    except Exception as e:
-                        logging.error(f"Error scraping page for product {link}: {e}")
-                    finally:
-                        await product_page.close()
-                
+                await page.locator(_PRODUCT_LINK_SELECTOR).first.wait_for(timeout=15000)
             except Exception as e:
-                logging.error(f"Error during Playwright scraping: {e}")
-                
-            finally:
-                await browser.close()
-        
-        return products
+                logging.warning(f"Product links did not appear on {self.base_url}: {e}")
+            
+            await self._handle_cookie_consent(page)
+            
+            product_links = await self._get_product_links(page)
+            logging.info(f"Found {len(product_links)} product links")
+            
+            if skip_paths:
+                product_links = [link for link in product_links if urlparse(link).path not in skip_paths]
+                logging.info(f"{len(product_links)} product links left after skipping already scraped pages")
+            
+            links_to_scrape = product_links[:limit] if limit > 0 and limit < len(product_links) else product_links
+            
+            async def scrape_link(i: int, link: str) -> Optional[Dict]:
+                logging.info(f"Scraping product {i+1}/{len(links_to_scrape)}: {link}")
+                # Server-rendered pages are read over plain HTTP; the browser
+                # is only used for pages that need JavaScript
+                if HTTP_SCRAPING_AVAILABLE:
+                    product_data = await self._scrape_via_http(link)
+                    if product_data:
+                        return product_data
+                product_page = await context.new_page()
+                try:
+                    return await self._scrape_product_page(product_page, link)
+                except Exception as e:
+                    logging.error(f"Error scraping page for product {link}: {e}")
+                    return None
+                finally:
+                    await product_page.close()
+            
+            # Scrape product pages concurrently, each in its own tab, so their
+            # network waits overlap. At most SCRAPE_CONCURRENCY pages run ahead
+            # of the caller, so only that many finished products are held
+            for i, link in enumerate(links_to_scrape):
+                if len(window) >= SCRAPE_CONCURRENCY:
+                    product_data = await window.popleft()
+                    if product_data:
+                        yield product_data
+                window.append(asyncio.create_task(scrape_link(i, link)))
+            while window:
+                product_data = await window.popleft()
+                if product_data:
+                    yield product_data
+            
+        except Exception as e:
+            logging.error(f"Error during Playwright scraping: {e}")
+            
+        finally:
+            # Stop outstanding pages if the caller stops iterating early
+            for task in window:
+                task.cancel()
+            await asyncio.gather(*window, return_exceptions=True)
+            await page.close()
+
+    async def _ensure_browser(self) -> "BrowserContext":
+        """Launch the browser on first use (or after it disconnects) and return the shared context"""
+        async with self._launch_lock:
+            if self._browser is None or not self._browser.is_connected():
+                await self._close_browser()
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True, args=_BROWSER_ARGS)
+                # One context for the listing and all product pages, so they share
+                # the cookie consent given on the listing page
+                self._context = await self._browser.new_context()
+                await self._context.route("**/*", self._route_request)
+            return self._context
+
+    async def _close_browser(self):
+        """Close the shared context, browser and Playwright driver, ignoring ones already gone"""
+        for closer in (
+            self._context and self._context.close,
+            self._browser and self._browser.close,
+            self._playwright and self._playwright.stop,
+        ):
+            if closer:
+                try:
+                    await closer()
+                except Exception as e:
+                    logging.warning(f"Error while closing the browser: {e}")
+        self._playwright = self._browser = self._context = None
+
+    async def aclose(self):
+        """Close the browser and HTTP client kept open between scrapes"""
+        async with self._launch_lock:
+            await self._close_browser()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    async def _route_request(self, route: "Route"):
+        """Abort requests for assets and trackers that the scraper does not need"""
+        request = route.request
+        if request.resource_type in _BLOCKED_RESOURCE_TYPES or _BLOCKED_URL_RE.search(request.url):
+            await route.abort()
+        else:
+            await route.continue_()
 
     async def _handle_cookie_consent(self, page: "Page"):
         """Handle cookie consent popup"""
         try:
-            # Using get_by_role to find the button by its accessible name is more robust
-            accept_button = page.get_by_role("button", name="Accept all cookies")
+            # OneTrust's button id first, then the button text; CSS and text
+            # selectors avoid computing accessible names across the whole page
+            accept_button = page.locator(
+                '#onetrust-accept-btn-handler, button:has-text("Accept all cookies")'
+            ).first
             logging.info("Found cookie consent button. Clicking 'Accept all cookies'.")
             await accept_button.click(timeout=5000)
-            await page.wait_for_timeout(1000) # Wait for animations
             
             # Forcefully remove the cookie banner to prevent it from interfering with clicks
             await page.evaluate("document.getElementById('onetrust-consent-sdk')?.remove()")
@@ -120,220 +271,319 @@ class VodafoneDataScraper:
     async def _get_product_links(self, page: "Page") -> List[str]:
         """Get product page links from the listing page."""
         links: List[str] = []
-        seen_paths = set()
         try:
-            # This selector targets links that look like product pages
-            product_link_elements = await page.locator('a[href*="/mobile/phones/pay-monthly-contracts/"]').all()
-            logging.info(f"Found {len(product_link_elements)} potential product link elements.")
-            
-            for element in product_link_elements:
-                href = await element.get_attribute('href')
-                if href:
-                    # Ignore links that are clearly not product pages
-                    if "/web-shop/login" in href or href.strip() == page.url:
-                        continue
-                    
-                    full_url = urljoin(page.url, href)
-                    
-                    # Normalize URL to use only the path for duplicate checking
-                    parsed_url = urlparse(full_url)
-                    clean_path = parsed_url.path
-
-                    # Ensure we are only adding unique product pages.
-                    # A product URL path will typically have more than 5 segments.
-                    # e.g., /mobile/phones/pay-monthly-contracts/apple/iphone-16-pro-max
-                    if clean_path.count('/') >= 5 and clean_path not in seen_paths and clean_path != urlparse(page.url).path:
-                        seen_paths.add(clean_path)
-                        links.append(full_url)
-            
+            # This selector targets links that look like product pages; all hrefs
+            # are read in one call rather than one round trip per element
+            hrefs = await page.eval_on_selector_all(
+                _PRODUCT_LINK_SELECTOR, "els => els.map(el => el.getAttribute('href'))"
+            )
+            logging.info(f"Found {len(hrefs)} potential product link elements.")
+            links = filter_product_links(hrefs, page.url)
             logging.info(f"Found {len(links)} unique product links after filtering and deduplication.")
 
         except Exception as e:
             logging.error(f"Error getting product links: {e}")
         return links
 
+    async def _scrape_via_http(self, url: str) -> Optional[Dict]:
+        """
+        Scrape a product page from its server-rendered HTML. Returns None if the
+        page can't be fetched or lacks details that only the browser would render.
+        """
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                headers=_HTTP_HEADERS, timeout=HTTP_SCRAPE_TIMEOUT, follow_redirects=True
+            )
+        try:
+            response = await self._http_client.get(url)
+            response.raise_for_status()
+            # Parsing is CPU-bound, so it runs off the event loop
+            product = await asyncio.to_thread(self._parse_product_html, response.text, url)
+        except Exception as e:
+            logging.info(f"Could not scrape {url} over HTTP, using the browser instead: {e}")
+            return None
+        if product is None:
+            logging.info(f"{url} is missing details in its HTML, using the browser instead")
+        return product
+
+    def _parse_product_html(self, html: str, url: str) -> Optional[Dict]:
+        """
+        Read product details from a page's HTML, or return None if the name,
+        storage options or device cost are missing, so the browser is used instead.
+        """
+        soup = BeautifulSoup(html, "html.parser")
+
+        h1 = soup.find("h1")
+        # Match the browser's text_content(): text nodes joined as they are
+        name = h1.get_text().strip() if h1 else ""
+
+        storage_options = []
+        capacity_container = soup.select_one('div:has([id*="selectedCapacity"])')
+        if capacity_container is not None:
+            raw_options = {
+                (int(value), unit.upper()) for value, unit in STORAGE_RE.findall(capacity_container.get_text(" "))
+            }
+            storage_options = self._filter_storage_options(raw_options)
+
+        # The storage selector and price are the parts most likely to be
+        # rendered client-side, where only the browser would find them
+        device_cost = None
+        cost_text = soup.find(string=_TOTAL_COST_RE)
+        if cost_text is not None:
+            cost_str = parse_price(cost_text.parent.get_text())
+            if cost_str is not None:
+                device_cost = float(cost_str)
+
+        if not name or not storage_options or device_cost is None:
+            return None
+
+        description = "No description available."
+        meta = soup.find("meta", attrs={"name": "description"})
+        if meta and meta.get("content"):
+            description = meta["content"].strip()
+        desc_container = soup.select_one('#product-description, [data-test-id*="description"]')
+        # The browser only reads a visible description block
+        if desc_container is not None and not _hidden_in_markup(desc_container):
+            detailed_description = desc_container.get_text("\n", strip=True)
+            if detailed_description:
+                description = detailed_description
+
+        return {
+            "name": sys.intern(name),
+            "description": sys.intern(description),
+            "url": url,
+            "storage_options": storage_options,
+            "device_cost": device_cost,
+        }
+
     async def _scrape_product_page(self, page: "Page", url: str) -> Optional[Dict]:
-        """Scrape a single product page for details, including storage options."""
+        """
+        Scrape a single product page for details, including storage options.
+        Gives up on pages that take longer than PAGE_SCRAPE_TIMEOUT seconds.
+        """
         try:
-            await page.goto(url, wait_until="domcontentloaded")
+            return await asyncio.wait_for(self._scrape_product_details(page, url), timeout=PAGE_SCRAPE_TIMEOUT)
+        except asyncio.TimeoutError:
+            logging.error(f"Timed out scraping detail page {url} after {PAGE_SCRAPE_TIMEOUT}s")
+            return None
+        except Exception as e:
+            logging.error(f"Error scraping detail page {url}: {e}")
+            return None
 
-            # Handle "Already with us?" popup using the provided test ID
-            try:
-                await page.get_by_test_id("newOrExisting-cta-new").click(timeout=5000)
-                logging.info("Clicked 'new customer' button successfully.")
-                await page.wait_for_timeout(1000)  # Wait for popup to close
-            except Exception:
-                logging.info("Did not find or could not click 'new customer' button. Assuming it is not present.")
-
-            # --- Product Name Extraction ---
-            name = ""
-            # 1. Try H1 tag
-            try:
-                await page.locator('h1').first.wait_for(timeout=3000)
-                h1_text = await page.locator('h1').first.text_content()
-                if h1_text and h1_text.strip():
-                    name = h1_text.strip()
-                    logging.info(f"Found product name in H1: {name}")
-            except Exception as e:
-                logging.warning(f"Could not get name from H1 for {url}: {e}")
+    async def _scrape_product_details(self, page: "Page", url: str) -> Dict:
+        """Load a product page and read its fields, which are independent DOM reads, concurrently."""
+        await page.goto(url, wait_until="domcontentloaded")
 
-            # 2. If H1 fails, try parsing from URL
-            if not name:
-                logging.info(f"H1 failed, falling back to URL parsing for name: {url}")
-                try:
-                    path = urlparse(url).path
-                    path_parts = [part for part in path.split('/') if part]
-                    if len(path_parts) >= 5: # e.g., ['mobile', 'phones', 'pay-monthly-contracts', 'apple', 'iphone-16']
-                        brand = path_parts[-2].title()
-                        model_slug = path_parts[-1]
-                        model = model_slug.replace('-', ' ').title()
-                        
-                        if "Iphone" in model:
-                            model = model.replace("Iphone", "iPhone")
-                        
-                        if not model.lower().startswith(brand.lower()):
-                            name = f"{brand} {model}"
-                        else:
-                            name = model
-                        logging.info(f"Constructed name from URL: {name}")
-                except Exception as e:
-                    logging.warning(f"URL parsing for name failed for {url}: {e}")
-            
-            # 3. If all else fails, use page title
-            if not name:
-                logging.info(f"URL parsing failed, falling back to page title for name: {url}")
-                name = await page.title()
-                name = name.split('|')[0].strip()
-
-            if not name:
-                name = "Unknown Product"
-                logging.error(f"Could not determine product name for {url}")
-
-            # --- Storage/Capacity Extraction using a Scoped DOM search ---
-            storage_options = []
-            try:
-                # Find a container likely to hold capacity options to scope the search
-                capacity_container = page.locator('div:has([id*="selectedCapacity"])')
-                
-                if await capacity_container.count() > 0:
-                    logging.info(f"Found capacity container for {url}. Scoping search to this container.")
-                    container_to_search = capacity_container.first
-                else:
-                    logging.warning(f"Could not find capacity container for {url}. Searching entire page.")
-                    container_to_search = page.locator('body')
-
-                potential_options = await container_to_search.locator('*:has-text("GB"), *:has-text("TB")').all_text_contents()
-                
-                raw_options = []
-                for text_blob in potential_options:
-                    found = re.findall(r'(\d+\s*(?:GB|TB))', text_blob, re.IGNORECASE)
-                    if found:
-                        raw_options.extend(found)
-                
-                if raw_options:
-                    normalized = [opt.replace(" ", "").upper() for opt in raw_options]
-                    storage_options = self._filter_storage_options(list(set(normalized)))
+        # Handle "Already with us?" popup using the provided test ID
+        try:
+            await page.locator('[data-testid="newOrExisting-cta-new"]').click(timeout=5000)
+            logging.info("Clicked 'new customer' button successfully.")
+            await page.wait_for_timeout(1000)  # Wait for popup to close
+        except Exception:
+            logging.info("Did not find or could not click 'new customer' button. Assuming it is not present.")
 
-            except Exception as e:
-                logging.warning(f"Could not scrape storage options for {url}: {e}")
+        name, storage_options, final_description, device_cost = await asyncio.gather(
+            self._extract_name(page, url),
+            self._extract_storage_options(page, url),
+            self._extract_description(page, url),
+            self._extract_device_cost(page, url),
+        )
 
-            # --- Detailed Description Extraction ---
-            description = "No description available."
-            desc_el = page.locator("meta[name='description']")
-            if await desc_el.count() > 0:
-                content = await desc_el.get_attribute("content")
-                if content:
-                    description = content.strip()
+        # Models in a range share their marketing copy, so identical names and
+        # descriptions are interned to hold one copy across the product list
+        return {
+            "name": sys.intern(name),
+            "description": sys.intern(final_description),
+            "url": url,
+            "storage_options": storage_options,
+            "device_cost": device_cost,
+        }
+
+    async def _extract_name(self, page: "Page", url: str) -> str:
+        """Read the product name from the H1, falling back to the URL and then the page title."""
+        name = ""
+        # 1. Try H1 tag
+        try:
+            await page.locator('h1').first.wait_for(timeout=3000)
+            h1_text = await page.locator('h1').first.text_content()
+            if h1_text and h1_text.strip():
+                name = h1_text.strip()
+                logging.info(f"Found product name in H1: {name}")
+        except Exception as e:
+            logging.warning(f"Could not get name from H1 for {url}: {e}")
 
-            detailed_description = ""
+        # 2. If H1 fails, try parsing from URL
+        if not name:
+            logging.info(f"H1 failed, falling back to URL parsing for name: {url}")
             try:
-                desc_container = page.locator('#product-description, [data-test-id*="description"]').first
-                if await desc_container.count() > 0 and await desc_container.is_visible():
-                    detailed_description = await desc_container.inner_text()
+                name = name_from_url(url) or ""
+                if name:
+                    logging.info(f"Constructed name from URL: {name}")
             except Exception as e:
-                logging.warning(f"Could not scrape detailed description for {url}: {e}")
+                logging.warning(f"URL parsing for name failed for {url}: {e}")
+        
+        # 3. If all else fails, use page title
+        if not name:
+            logging.info(f"URL parsing failed, falling back to page title for name: {url}")
+            name = await page.title()
+            name = name.split('|')[0].strip()
 
-            final_description = detailed_description.strip() if detailed_description else description
+        if not name:
+            name = "Unknown Product"
+            logging.error(f"Could not determine product name for {url}")
 
-            # --- Device Cost Extraction ---
-            device_cost = None
-            try:
-                # Look for an element containing the text "Total device cost". This is more robust.
-                cost_locator = page.locator('*:text-matches("Total device cost", "i")').first
-                await cost_locator.wait_for(timeout=3000)
-                cost_text = await cost_locator.text_content()
-                
-                logging.info(f"Found cost-related text for {url}: '{cost_text}'")
-
-                match = re.search(r'£([\d,]+\.?\d*)', cost_text)
-                if match:
-                    cost_str = match.group(1).replace(',', '')
-                    device_cost = float(cost_str)
-                    logging.info(f"Extracted device cost for {url}: £{device_cost}")
-                else:
-                    logging.warning(f"Could not parse cost from text for {url}: '{cost_text}'")
-            except Exception as e:
-                logging.warning(f"Could not find or parse device cost for {url}. It might not be on the page. Error: {e}")
-
-            return {
-                "name": name,
-                "description": final_description,
-                "url": url,
-                "storage_options": storage_options,
-                "device_cost": device_cost,
+        return name
+
+    async def _extract_storage_options(self, page: "Page", url: str) -> List[str]:
+        """Find the storage capacities offered on the page, using a scoped DOM search."""
+        storage_options = []
+        try:
+            # Find a container likely to hold capacity options to scope the search
+            capacity_container = page.locator('div:has([id*="selectedCapacity"])')
+            
+            if await capacity_container.count() > 0:
+                logging.info(f"Found capacity container for {url}. Scoping search to this container.")
+                container_to_search = capacity_container.first
+            else:
+                logging.warning(f"Could not find capacity container for {url}. Searching entire page.")
+                container_to_search = page.locator('body')
+
+            # Fetch the container's text once and find capacities in it,
+            # rather than querying every element that mentions GB or TB
+            container_text = await container_to_search.inner_text()
+            raw_options = {
+                (int(value), unit.upper()) for value, unit in STORAGE_RE.findall(container_text)
             }
+            
+            if raw_options:
+                storage_options = self._filter_storage_options(raw_options)
+
         except Exception as e:
-            logging.error(f"Error scraping detail page {url}: {e}")
-            return None
+            logging.warning(f"Could not scrape storage options for {url}: {e}")
+
+        return storage_options
+
+    async def _extract_description(self, page: "Page", url: str) -> str:
+        """Read the detailed product description, falling back to the meta description."""
+        description = "No description available."
+        desc_el = page.locator("meta[name='description']")
+        if await desc_el.count() > 0:
+            content = await desc_el.get_attribute("content")
+            if content:
+                description = content.strip()
+
+        detailed_description = ""
+        try:
+            desc_container = page.locator('#product-description, [data-test-id*="description"]').first
+            if await desc_container.count() > 0 and await desc_container.is_visible():
+                detailed_description = await desc_container.inner_text()
+        except Exception as e:
+            logging.warning(f"Could not scrape detailed description for {url}: {e}")
+
+        return detailed_description.strip() if detailed_description else description
+
+    async def _extract_device_cost(self, page: "Page", url: str) -> Optional[float]:
+        """Read the total device cost, if the page shows one."""
+        device_cost = None
+        try:
+            # Look for an element containing the text "Total device cost". This is more robust.
+            cost_locator = page.locator('*:text-matches("Total device cost", "i")').first
+            await cost_locator.wait_for(timeout=3000)
+            cost_text = await cost_locator.text_content()
+            
+            logging.info(f"Found cost-related text for {url}: '{cost_text}'")
+
+            cost_str = parse_price(cost_text)
+            if cost_str is not None:
+                device_cost = float(cost_str)
+                logging.info(f"Extracted device cost for {url}: £{device_cost}")
+            else:
+                logging.warning(f"Could not parse cost from text for {url}: '{cost_text}'")
+        except Exception as e:
+            logging.warning(f"Could not find or parse device cost for {url}. It might not be on the page. Error: {e}")
+
+        return device_cost
     
-    def _filter_storage_options(self, options: List[str]) -> List[str]:
+    def _filter_storage_options(self, options: Iterable[Tuple[int, str]]) -> List[str]:
         """
-        Filters and sorts a list of storage-like strings to return only plausible
-        device storage values.
+        Filters and sorts (value, unit) storage capacities, e.g. (128, "GB"), to
+        return only plausible device storage values.
         """
-        # Expanded set of plausible storage sizes
-        plausible_storage_gb = {16, 32, 64, 128, 256, 512, 1024}
-        plausible_storage_tb = {1, 2, 4}
-        
-        filtered_options = set()
-        for opt in options:
-            match = re.match(r'(\d+)(GB|TB)', opt, re.IGNORECASE)
-            if match:
-                val, unit = int(match.group(1)), match.group(2).upper()
-                
-                if unit == 'GB':
-                    if val in plausible_storage_gb:
-                        # Normalize 1024GB to 1TB for consistency
-                        if val == 1024:
-                            filtered_options.add("1TB")
-                        else:
-                            filtered_options.add(f"{val}GB")
-                elif unit == 'TB':
-                    if val in plausible_storage_tb:
-                        filtered_options.add(f"{val}TB")
-        
-        # Define a sort key to handle GB and TB values correctly
-        def sort_key(s):
-            match = re.match(r'(\d+)(GB|TB)', s, re.IGNORECASE)
-            val, unit = int(match.group(1)), match.group(2).upper()
-            # Convert TB to GB for sorting (1 TB = 1024 GB)
-            return val * 1024 if unit == 'TB' else val
-
-        return sorted(list(filtered_options), key=sort_key)
+        # Models in a range tend to offer the same capacities, so results are memoised
+        return list(storage_labels(frozenset(options)))
 
     def save_products(self, products: List[Dict], filename: Optional[str] = None) -> bool:
         """Saves a list of products to a JSON file."""
         if filename is None:
             filename = self.data_file
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(products, f, indent=2, ensure_ascii=False)
+            data = orjson.dumps(products, option=orjson.OPT_INDENT_2)
+            # Leave an identical file untouched, so readers keyed on its mtime
+            # (such as the search engine) don't reload it
+            if os.path.exists(filename) and os.path.getsize(filename) == len(data):
+                with open(filename, 'rb') as f:
+                    if f.read() == data:
+                        logging.info(f"Products in {filename} are unchanged, not rewriting it")
+                        return True
+            # Write a temporary file and swap it in, so readers never see a
+            # partially written file
+            tmp_filename = f"{filename}.tmp"
+            with open(tmp_filename, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_filename, filename)
             logging.info(f"Saved {len(products)} products to {filename}")
             return True
         except Exception as e:
             logging.error(f"Error saving products to {filename}: {e}")
             return False
 
+    async def save_products_async(self, products: List[Dict], filename: Optional[str] = None) -> bool:
+        """Saves a list of products to a JSON file without blocking the event loop."""
+        return await asyncio.to_thread(self.save_products, products, filename)
+
+    async def save_products_stream(
+        self, products: AsyncIterator[Dict], filename: Optional[str] = None
+    ) -> Optional[int]:
+        """
+        Saves products to a JSON file as they arrive, holding one at a time.
+        The file has the same layout save_products writes, and is only replaced
+        once at least one product has been written. Returns the number of
+        products written, or None if saving failed.
+        """
+        if filename is None:
+            filename = self.data_file
+        tmp_filename = f"{filename}.tmp"
+        count = 0
+        try:
+            f = await asyncio.to_thread(open, tmp_filename, 'wb')
+            try:
+                async for product in products:
+                    # An array element as OPT_INDENT_2 lays it out inside the list
+                    item = b"  " + orjson.dumps(product, option=orjson.OPT_INDENT_2).replace(b"\n", b"\n  ")
+                    await asyncio.to_thread(f.write, (b",\n" if count else b"[\n") + item)
+                    count += 1
+                await asyncio.to_thread(f.write, b"\n]" if count else b"[]")
+            finally:
+                await asyncio.to_thread(f.close)
+            
+            if not count:
+                os.remove(tmp_filename)
+                logging.warning(f"No products to save, leaving {filename} as it is")
+                return 0
+            # Leave an identical file untouched, as save_products does
+            if os.path.exists(filename) and await asyncio.to_thread(filecmp.cmp, tmp_filename, filename, False):
+                os.remove(tmp_filename)
+                logging.info(f"Products in {filename} are unchanged, not rewriting it")
+                return count
+            os.replace(tmp_filename, filename)
+            logging.info(f"Saved {count} products to {filename}")
+            return count
+        except Exception as e:
+            logging.error(f"Error saving products to {filename}: {e}")
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
+            return None
+
     def update_sample_data(self):
         """Update the main data file with sample products"""
         products = self.get_sample_products()
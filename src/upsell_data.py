@@ -1,55 +1,95 @@
+import sys
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
 
-INSURANCE_PLANS = {
-    "screen_damage": {
-        "name": "Screen Damage Insurance",
-        "price": "£5 per month",
-        "description": "This policy insures your device against accidental damage to the front screen and any additional damage, except for liquid, catastrophic, or cosmetic damage."
-    },
-    "full_cover": {
-        "name": "Loss, theft, damage and breakdown cover",
-        "price": "£13.50 per month",
-        "description": "This policy insures your device against loss, theft, damage and breakdown outside of the manufacturer's warranty."
-    },
-    "damage_breakdown": {
-        "name": "Damage and breakdown cover",
-        "price": "£8.50 per month",
-        "description": "This policy insures your device against damage and breakdown outside of the manufacturer's warranty."
-    }
-}
-
-ACCESSORIES = {
-    "case_protector": {
-        "name": "Caseym Case & Tempered Glass Black",
-        "price": "£29.99",
-        "description": "Eco-conscious protection pack for your phone, designed to protect against those clumsy 'oops' moments. The caseym protection pack contains a matte black durable case manufactured with biodegradable materials, and a robust and reliable tempered glass screen protector. All caseym products are packaged in recycled and recyclable kraft card."
-    },
-    "earbuds": {
-        "name": "JLab GO Air Pop Slate",
-        "price": "£24.99",
-        "description": "32+ hours Bluetooth® 5.1 playtime, 8+ hours in each earbud, 15% smaller fit, Custom EQ3 Sound, Touch Sensors"
-    },
-    "charger": {
-        "name": "Belkin 30w Type C Adapter White",
-        "price": "£24.99",
-        "description": "30 Watt USB-C wall charger, Fast charging, 0-50% in 24 minutes (iPhone 13)"
-    },
-    "screen_protector": {
-        "name": "PanzerGlass Screen Protector Clear",
-        "price": "£15.99",
-        "description": "The PanzerGlass screen protector with antibacterial coating has the same features as the original PanzerGlass and will protect your screen from scratches and bumps. The Standard Fit glass is reduced in size and features full silicone adhesive which gives perfect touch sensitivity whilst still delivering the superior PanzerGlass strength"
-    }
-}
-
-WATCHES = {
-    "apple_watch_series_10": {
-        "name": "Apple Watch Series 10 (GPS+4G) Cellular 46mm Aluminium",
-        "price": "£499",
-        "description": "The Apple Watch Series 10 is packed with advanced health and fitness features on an even bigger screen, plus faster charging",
-        "url": "https://www.vodafone.co.uk/smart-watches-and-wearables/apple/watch-series-10-gps-plus4g-cellular-46mm-aluminium"
-    },
-    "apple_watch_ultra_2": {
-        "name": "Apple Watch Ultra 2 (GPS+4G) Cellular 49mm Black Titanium Ocean Band",
-        "price": "£799",
-        "description": "Designed for water-based adventures, the Apple Watch Ultra 2 shows water temperature and route maps for open water swimming."
-    }
-} 
\ No newline at end of file
+
+@dataclass(frozen=True, slots=True)
+class UpsellItem:
+    """A single upsell offer shown to the customer after a recommendation."""
+    key: str
+    name: str
+    price: str
+    description: str
+    url: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, str]:
+        """The item as the name/price/description(/url) dict used before UpsellItem existed"""
+        data = {"name": self.name, "price": self.price, "description": self.description}
+        if self.url is not None:
+            data["url"] = self.url
+        return data
+
+
+def _item(key: str, name: str, price: str, description: str, url: Optional[str] = None) -> UpsellItem:
+    # The short identifying strings are interned; descriptions are unique per item
+    return UpsellItem(sys.intern(key), sys.intern(name), sys.intern(price), description, url)
+
+
+INSURANCE_PLANS: Tuple[UpsellItem, ...] = (
+    _item(
+        "screen_damage",
+        "Screen Damage Insurance",
+        "£5 per month",
+        "This policy insures your device against accidental damage to the front screen and any additional damage, except for liquid, catastrophic, or cosmetic damage.",
+    ),
+    _item(
+        "full_cover",
+        "Loss, theft, damage and breakdown cover",
+        "£13.50 per month",
+        "This policy insures your device against loss, theft, damage and breakdown outside of the manufacturer's warranty.",
+    ),
+    _item(
+        "damage_breakdown",
+        "Damage and breakdown cover",
+        "£8.50 per month",
+        "This policy insures your device against damage and breakdown outside of the manufacturer's warranty.",
+    ),
+)
+
+ACCESSORIES: Tuple[UpsellItem, ...] = (
+    _item(
+        "case_protector",
+        "Caseym Case & Tempered Glass Black",
+        "£29.99",
+        "Eco-conscious protection pack for your phone, designed to protect against those clumsy 'oops' moments. The caseym protection pack contains a matte black durable case manufactured with biodegradable materials, and a robust and reliable tempered glass screen protector. All caseym products are packaged in recycled and recyclable kraft card.",
+    ),
+    _item(
+        "earbuds",
+        "JLab GO Air Pop Slate",
+        "£24.99",
+        "32+ hours Bluetooth® 5.1 playtime, 8+ hours in each earbud, 15% smaller fit, Custom EQ3 Sound, Touch Sensors",
+    ),
+    _item(
+        "charger",
+        "Belkin 30w Type C Adapter White",
+        "£24.99",
+        "30 Watt USB-C wall charger, Fast charging, 0-50% in 24 minutes (iPhone 13)",
+    ),
+    _item(
+        "screen_protector",
+        "PanzerGlass Screen Protector Clear",
+        "£15.99",
+        "The PanzerGlass screen protector with antibacterial coating has the same features as the original PanzerGlass and will protect your screen from scratches and bumps. The Standard Fit glass is reduced in size and features full silicone adhesive which gives perfect touch sensitivity whilst still delivering the superior PanzerGlass strength",
+    ),
+)
+
+WATCHES: Tuple[UpsellItem, ...] = (
+    _item(
+        "apple_watch_series_10",
+        "Apple Watch Series 10 (GPS+4G) Cellular 46mm Aluminium",
+        "£499",
+        "The Apple Watch Series 10 is packed with advanced health and fitness features on an even bigger screen, plus faster charging",
+        "https://www.vodafone.co.uk/smart-watches-and-wearables/apple/watch-series-10-gps-plus4g-cellular-46mm-aluminium",
+    ),
+    _item(
+        "apple_watch_ultra_2",
+        "Apple Watch Ultra 2 (GPS+4G) Cellular 49mm Black Titanium Ocean Band",
+        "£799",
+        "Designed for water-based adventures, the Apple Watch Ultra 2 shows water temperature and route maps for open water swimming.",
+    ),
+)
+
+# Key lookups for callers that address an item directly
+INSURANCE_PLANS_BY_KEY: Dict[str, UpsellItem] = {item.key: item for item in INSURANCE_PLANS}
+ACCESSORIES_BY_KEY: Dict[str, UpsellItem] = {item.key: item for item in ACCESSORIES}
+WATCHES_BY_KEY: Dict[str, UpsellItem] = {item.key: item for item in WATCHES}